@@ -0,0 +1,174 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import re
+import sys
+import time
+
+import degrees
+from cache import ComponentIndex, PathCache
+from nameindex import NameIndex
+
+# Matches a name followed by a birth year, like "Kevin Bacon (1958)"
+NAME_WITH_BIRTH = re.compile(r"^(.*?)\s*\((\d{4})\)$")
+
+# NameIndex used to correct misspelled names, if enabled
+name_index = None
+
+# PathCache answering repeated and unconnected queries, if enabled
+path_cache = None
+
+
+def resolve(name):
+    """
+    Returns (person_id, error) for a name, without asking
+    the user to pick between people who share it.
+
+    A trailing "(year)" picks people born in that year, and
+    with a name index loaded, a name that is not found is
+    replaced by its closest match if there is only one.
+    """
+    birth = None
+    match = NAME_WITH_BIRTH.match(name)
+    if match:
+        name, birth = match.group(1), match.group(2)
+
+    person_ids = degrees.person_ids_for_name(name, birth)
+    if len(person_ids) == 0 and name_index is not None:
+        matches = name_index.fuzzy(name)
+        closest = {match_name for distance, match_name, _ in matches
+                   if distance == matches[0][0]}
+        if len(closest) == 1:
+            person_ids = degrees.person_ids_for_name(closest.pop(), birth)
+
+    if len(person_ids) == 0:
+        return None, "person not found"
+    elif len(person_ids) > 1:
+        return None, "ambiguous name"
+    return person_ids[0], None
+
+
+def answer(line, bidirectional=False):
+    """
+    Answers one "source<TAB>target" query line with a JSON line.
+    """
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) != 2:
+        return json.dumps({"query": line.rstrip("\n"), "error": "expected source<TAB>target"})
+
+    result = {"source": fields[0], "target": fields[1]}
+    source, error = resolve(fields[0])
+    if error is None:
+        target, error = resolve(fields[1])
+    if error is not None:
+        result["error"] = error
+        return json.dumps(result)
+
+    if path_cache is not None:
+        search = path_cache.shortest_path
+    elif bidirectional:
+        search = degrees.bidirectional_shortest_path
+    else:
+        search = degrees.shortest_path
+    path = search(source, target)
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [list(step) for step in path]
+    return json.dumps(result)
+
+
+def answer_bidirectional(line):
+    """
+    Answers one query line with bidirectional search.
+    """
+    return answer(line, bidirectional=True)
+
+
+def main():
+    global name_index, path_cache
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries, one source<TAB>target pair per line."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?", help="query file, defaults to stdin")
+    parser.add_argument("--backend", choices=["dict", "compact", "snapshot"])
+    parser.add_argument("--bidirectional", action="store_true")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="forked processes sharing the loaded data")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="replace names that are not found by their closest match")
+    parser.add_argument("--cache", type=int, metavar="SIZE",
+                        help="cache this many recent paths and index connected components")
+    parser.add_argument("--memory-budget", type=int, metavar="MIB",
+                        help="stop loading once it has used more memory than this, "
+                             "using the compact backend unless another is given")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    budget = args.memory_budget * 2 ** 20 if args.memory_budget is not None else None
+    try:
+        degrees.load_data(args.directory, backend=args.backend, memory_budget=budget)
+    except MemoryError as e:
+        sys.exit(str(e))
+    print("Data loaded.", file=sys.stderr)
+    for line in degrees.load_stats.report():
+        print(f"  {line}", file=sys.stderr)
+
+    if args.fuzzy:
+        if degrees.graph is not None:
+            name_index = NameIndex.from_graph(degrees.graph, stats=degrees.load_stats)
+        else:
+            name_index = NameIndex.from_people(degrees.people, stats=degrees.load_stats)
+
+        # the deletion index is built on the first misspelled name, or
+        # now if forked workers should share it instead of each building one
+        if args.workers > 1:
+            name_index.deletes()
+            for line in degrees.load_stats.report_indexes():
+                print(f"  {line}", file=sys.stderr)
+    if args.cache is not None:
+        path_cache = PathCache(
+            args.cache,
+            search=degrees.bidirectional_shortest_path if args.bidirectional else degrees.shortest_path,
+            components=ComponentIndex()
+        )
+
+    queries = open(args.queries, encoding="utf-8") if args.queries else sys.stdin
+    work = answer_bidirectional if args.bidirectional else answer
+    count = 0
+    start = time.perf_counter()
+
+    with queries:
+        lines = (line for line in queries if line.strip())
+        if args.workers > 1:
+
+            # keep the loaded data out of the collector so forked workers
+            # share its pages copy-on-write instead of touching them
+            gc.freeze()
+            with multiprocessing.get_context("fork").Pool(args.workers) as pool:
+                for output in pool.imap(work, lines, chunksize=64):
+                    print(output)
+                    count += 1
+        else:
+            for line in lines:
+                print(work(line))
+                count += 1
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{count} queries in {elapsed:.2f} s ({rate:.1f} queries/s).", file=sys.stderr)
+
+    # forked workers keep their own copy of the counters
+    if path_cache is not None and args.workers <= 1:
+        print(json.dumps(path_cache.stats()), file=sys.stderr)
+    if args.workers <= 1:
+        for line in degrees.load_stats.report_indexes():
+            print(f"  {line}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import snapshot_is_fresh
+from landmarks import Landmarks, landmarks_path
+from nameindex import NameIndex
+from util import Node, StackFrontier, QueueFrontier, DequeStackFrontier, DequeQueueFrontier
+
+
+def benchmark_search(pairs, searches):
+    """
+    Runs every search on every (source, target) pair and
+    prints the people expanded and time taken per query.
+    """
+    totals = {name: [0, 0.0] for name in searches}
+
+    for source, target in pairs:
+        lengths = set()
+        for name, search in searches.items():
+            start = time.perf_counter()
+            path = search(source, target)
+            elapsed = time.perf_counter() - start
+
+            expanded = degrees.search_stats["expanded"]
+            totals[name][0] += expanded
+            totals[name][1] += elapsed
+            separation = "-" if path is None else len(path)
+            lengths.add(separation)
+            print(f"{name:>14} {source:>10} -> {target:<10} "
+                  f"degrees: {separation:>4} "
+                  f"expanded: {expanded:>8} time: {elapsed * 1000:9.2f} ms")
+
+        # every search has to agree on the degrees of separation
+        if len(lengths) > 1:
+            sys.exit(f"Searches disagree on {source} -> {target}")
+
+    print()
+    for name, (expanded, elapsed) in totals.items():
+        print(f"{name:>14} total expanded: {expanded:>10} "
+              f"total time: {elapsed:9.3f} s")
+
+
+def benchmark_frontiers(sizes=(10_000, 1_000_000), operations=200):
+    """
+    Fills every frontier class up to each size and prints the
+    average time of add, contains_actor and remove at that size.
+    """
+    frontiers = {
+        "StackFrontier": StackFrontier,
+        "QueueFrontier": QueueFrontier,
+        "DequeStackFrontier": DequeStackFrontier,
+        "DequeQueueFrontier": DequeQueueFrontier,
+    }
+
+    for size in sizes:
+        print(f"Frontier size {size}")
+        for name, frontier_class in frontiers.items():
+            frontier = frontier_class()
+            for actor in range(size):
+                frontier.add(Node(None, None, actor))
+
+            # time a fixed number of operations so the list
+            # frontiers finish even at a million nodes
+            start = time.perf_counter()
+            for actor in range(size, size + operations):
+                frontier.add(Node(None, None, actor))
+            add = (time.perf_counter() - start) / operations
+
+            start = time.perf_counter()
+            for actor in range(size // 2, size // 2 + operations):
+                frontier.contains_actor(actor)
+            contains = (time.perf_counter() - start) / operations
+
+            start = time.perf_counter()
+            for _ in range(operations):
+                frontier.remove()
+            remove = (time.perf_counter() - start) / operations
+
+            print(f"{name:>20} add: {add * 1e6:10.2f} us "
+                  f"contains: {contains * 1e6:10.2f} us "
+                  f"remove: {remove * 1e6:10.2f} us")
+        print()
+
+
+def benchmark_backends(directory, count):
+    """
+    Loads the data with every backend and prints the memory it
+    takes along with the latency of the same random queries.
+    """
+    pairs = None
+    for backend in ("dict", "compact"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        degrees.load_data(directory, backend=backend)
+        load_time = time.perf_counter() - start
+        memory, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # both backends answer the same queries
+        if pairs is None:
+            pairs = random_pairs(count)
+
+        latencies = []
+        for source, target in pairs:
+            start = time.perf_counter()
+            degrees.shortest_path(source, target)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        print(f"{backend:>8} load: {load_time:8.3f} s "
+              f"memory: {memory / 2 ** 20:9.1f} MiB "
+              f"peak: {peak / 2 ** 20:9.1f} MiB "
+              f"median query: {latencies[len(latencies) // 2] * 1000:9.2f} ms "
+              f"max query: {latencies[-1] * 1000:9.2f} ms")
+
+        # drop the dictionaries before loading the compact backend
+        if backend == "dict":
+            degrees.names.clear()
+            degrees.people.clear()
+            degrees.movies.clear()
+
+
+def benchmark_names(count):
+    """
+    Builds a NameIndex over the loaded people and prints the
+    average time of exact, prefix and fuzzy lookups.
+    """
+    start = time.perf_counter()
+    if degrees.graph is not None:
+        index = NameIndex.from_graph(degrees.graph)
+    else:
+        index = NameIndex.from_people(degrees.people)
+    print(f"index built in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    index.deletes()
+    print(f"fuzzy index built in {time.perf_counter() - start:.2f} s, "
+          f"{index.deletes_size() / 2 ** 20:.1f} MiB")
+
+    rng = random.Random(0)
+    queries = [rng.choice(index.keys) for _ in range(count)]
+    typos = []
+    for name in queries:
+        i = rng.randrange(len(name)) if name else 0
+        typos.append(name[:i] + name[i + 1:])
+
+    lookups = {
+        "exact": lambda name: index.exact(name),
+        "prefix": lambda name: index.prefix(name[:4], limit=10),
+        "fuzzy": lambda name: index.fuzzy(name, limit=10),
+    }
+    for label, lookup in lookups.items():
+        words = typos if label == "fuzzy" else queries
+        start = time.perf_counter()
+        for name in words:
+            lookup(name)
+        average = (time.perf_counter() - start) / len(words)
+        print(f"{label:>8} lookup: {average * 1e6:9.1f} us")
+
+
+def benchmark_landmarks(directory, count):
+    """
+    Compares BFS, bidirectional BFS and landmark A* on random
+    queries, and prints how tight the landmark bounds are.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, backend=None if snapshot_is_fresh(directory) else "compact")
+    print("Data loaded.")
+
+    path = landmarks_path(directory)
+    table = None
+    if os.path.exists(path):
+        try:
+            table = Landmarks.load(degrees.graph, path)
+        except ValueError as e:
+            print(f"{e}, building a new one...")
+    else:
+        print("No landmark table, building one...")
+    if table is None:
+        table = Landmarks.build(degrees.graph, 16)
+
+    def alt_shortest_path(source, target):
+        path = table.shortest_path(source, target)
+        degrees.search_stats["expanded"] = table.expanded
+        return path
+
+    pairs = random_pairs(count)
+    benchmark_search(pairs, {
+        "bfs": degrees.shortest_path,
+        "bidirectional": degrees.bidirectional_shortest_path,
+        "alt": alt_shortest_path,
+    })
+
+    exact = 0
+    connected = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        bounds = table.estimate(source, target)
+        if bounds is not None and bounds[1] is not None:
+            connected += 1
+            exact += bounds[0] == bounds[1]
+    elapsed = (time.perf_counter() - start) / len(pairs)
+    print(f"estimate: {elapsed * 1e6:.1f} us per query, "
+          f"exact for {exact} of {connected} bounded pairs")
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns count random pairs of distinct person_ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [tuple(rng.sample(person_ids, 2)) for _ in range(count)]
+
+
+def main():
+    args = sys.argv[1:]
+    mode = "search"
+    if args and args[0] in ("search", "frontier", "backend", "names", "landmarks"):
+        mode = args.pop(0)
+    if len(args) > 2:
+        sys.exit("Usage: python benchmark.py [search | frontier | backend | names | landmarks] [directory] [count]")
+    directory = args[0] if len(args) >= 1 else "large"
+    count = int(args[1]) if len(args) == 2 else 20
+
+    if mode == "frontier":
+        benchmark_frontiers()
+        return
+    elif mode == "backend":
+        benchmark_backends(directory, count)
+        return
+    elif mode == "landmarks":
+        benchmark_landmarks(directory, count)
+        return
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    if mode == "names":
+        benchmark_names(count)
+        return
+
+    benchmark_search(random_pairs(count), {
+        "bfs": degrees.shortest_path,
+        "bidirectional": degrees.bidirectional_shortest_path,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from array import array
+from collections import OrderedDict
+
+import degrees
+
+
+class ComponentIndex():
+    """
+    Labels every person with their connected component, so people
+    in different components are known to be unconnected at once.
+    """
+
+    def __init__(self):
+        graph = degrees.graph
+        if graph is not None:
+            self.index = graph.person_index
+            casts = (graph.stars_of(movie) for movie in range(len(graph.movie_ids)))
+        else:
+            self.index = {person_id: i for i, person_id in enumerate(degrees.people)}
+            casts = (
+                [self.index[person_id] for person_id in movie["stars"]]
+                for movie in degrees.movies.values()
+            )
+
+        # union-find over person indices, joining the stars of every movie
+        parent = array("i", range(len(self.index)))
+        for stars in casts:
+            if len(stars) > 1:
+                root = find(parent, stars[0])
+                for person in stars[1:]:
+                    other = find(parent, person)
+                    if other != root:
+                        parent[other] = root
+
+        self.labels = array("i", (find(parent, person) for person in range(len(parent))))
+        self.count = sum(1 for person, label in enumerate(self.labels) if person == label)
+
+        # hits are queries answered as not connected, misses still need a search
+        self.hits = 0
+        self.misses = 0
+
+    def label(self, person_id):
+        """
+        Returns the component label of a person_id.
+        """
+        return self.labels[self.index[person_id]]
+
+    def connected(self, source, target):
+        """
+        Returns True if source and target are in the same component.
+        """
+        if self.label(source) == self.label(target):
+            self.misses += 1
+            return True
+        self.hits += 1
+        return False
+
+
+class PathCache():
+    """
+    Least recently used cache of shortest paths between
+    (source, target) pairs, skipping the search entirely
+    for people a ComponentIndex knows are not connected.
+    """
+
+    def __init__(self, maxsize=1024, search=None, components=None):
+        self.maxsize = maxsize
+        self.search = search if search is not None else degrees.shortest_path
+        self.components = components
+        self.paths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def shortest_path(self, source, target):
+        """
+        Returns the same path as the search function would,
+        from the cache when it has been asked for recently.
+        """
+        if self.components is not None and not self.components.connected(source, target):
+            return None
+
+        key = (source, target)
+        if key in self.paths:
+            self.hits += 1
+            self.paths.move_to_end(key)
+            path = self.paths[key]
+            return None if path is None else list(path)
+
+        self.misses += 1
+        path = self.search(source, target)
+        if self.maxsize > 0:
+            self.paths[key] = None if path is None else tuple(path)
+            if len(self.paths) > self.maxsize:
+                self.paths.popitem(last=False)
+        return path
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of the cache
+        and of its component index.
+        """
+        stats = {"cache_hits": self.hits, "cache_misses": self.misses,
+                 "cache_size": len(self.paths)}
+        if self.components is not None:
+            stats["component_hits"] = self.components.hits
+            stats["component_misses"] = self.components.misses
+        return stats
+
+
+def find(parent, person):
+    """
+    Returns the root of a person in a union-find parent array,
+    halving the path on the way up.
+    """
+    while parent[person] != person:
+        parent[person] = parent[parent[person]]
+        person = parent[person]
+    return person
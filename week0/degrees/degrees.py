@@ -1,7 +1,9 @@
-import csv
 import sys
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph, PeopleView, MoviesView, NamesView, snapshot_path, snapshot_is_fresh
+from ingest import IngestStats, paused_gc, read_csv
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,55 +14,124 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding the data when loaded with the compact backend,
+# in which case names, people and movies are read-only views of it
+graph = None
 
-def load_data(directory):
+# Counts the rows read and rejected by the most recent load_data
+load_stats = IngestStats()
+
+# Counts the people expanded by the most recent search
+search_stats = {"expanded": 0}
+
+
+def load_data(directory, backend=None, memory_budget=None):
     """
     Load data from CSV files into memory.
+
+    The "dict" backend fills names, people and movies with
+    dictionaries; the "compact" backend stores the data in a
+    CompactGraph instead. By default, a snapshot written by
+    snapshot.py is opened when it is newer than the CSV files,
+    and the dict backend is used otherwise.
+
+    Rows read and rejected are counted in load_stats, and loading
+    stops with MemoryError once it has grown the process by more
+    than memory_budget bytes. Given a budget and no backend, the
+    compact backend is used instead of the dict backend, as it
+    needs a fraction of the memory; with the dict backend chosen
+    explicitly, the budget only stops loading.
     """
+    global load_stats
+    load_stats = IngestStats(memory_budget)
+
+    if backend is None:
+        if snapshot_is_fresh(directory):
+            backend = "snapshot"
+        else:
+            backend = "dict" if memory_budget is None else "compact"
+
+    if backend == "snapshot":
+        load_graph(CompactGraph.load(snapshot_path(directory)))
+        return
+    elif backend == "compact":
+        with paused_gc():
+            load_graph(CompactGraph.from_csv(directory, load_stats))
+        return
+    elif backend != "dict":
+        raise ValueError(f"Unknown backend: {backend}")
+
+    with paused_gc():
+        load_dicts(directory)
+
+
+def load_dicts(directory):
+    """
+    Fill names, people and movies from the CSV files in directory.
+    """
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
+    path = f"{directory}/people.csv"
+    for chunk in read_csv(path, ("id", "name", "birth"), load_stats, ("id", "birth")):
+        for person_id, name, birth in chunk:
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+            key = sys.intern(name.lower())
+            if key not in names:
+                names[key] = {person_id}
             else:
-                names[row["name"].lower()].add(row["id"])
+                names[key].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
+    path = f"{directory}/movies.csv"
+    for chunk in read_csv(path, ("id", "title", "year"), load_stats, ("id", "year")):
+        for movie_id, title, year in chunk:
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
                 "stars": set()
             }
 
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    # Load stars, rejecting rows with an unknown person or movie
+    path = f"{directory}/stars.csv"
+    for chunk in read_csv(path, ("person_id", "movie_id"), load_stats, ("person_id", "movie_id")):
+        for person_id, movie_id in chunk:
+            if person_id in people and movie_id in movies:
+                people[person_id]["movies"].add(movie_id)
+                movies[movie_id]["stars"].add(person_id)
+            else:
+                load_stats.reject(path)
+
+
+def load_graph(compact_graph):
+    """
+    Serve names, people and movies from a CompactGraph.
+    """
+    global graph, names, people, movies
+    graph = compact_graph
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if arg != "--bidirectional"]
+    if len(args) > 1:
+        sys.exit("Usage: python degrees.py [--bidirectional] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
+    search = shortest_path
+    if "--bidirectional" in sys.argv[1:]:
+        search = bidirectional_shortest_path
 
     # Load data from files into memory
     print("Loading data...")
     load_data(directory)
     print("Data loaded.")
+    for line in load_stats.report():
+        print(f"  {line}")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +140,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = search(source, target)
 
     if path is None:
         print("Not connected.")
@@ -91,7 +162,16 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
-    frontier = QueueFrontier()
+    if graph is not None:
+        path = graph.shortest_path(source, target)
+        search_stats["expanded"] = graph.expanded
+        return path
+
+    search_stats["expanded"] = 0
+    if source == target:
+        return []
+
+    frontier = DequeQueueFrontier()
     start_node = Node(None, None, source)
     frontier.add(start_node)
     explored = set()
@@ -106,6 +186,7 @@ def shortest_path(source, target):
             # get current node from frontier
             node = frontier.remove()
             explored.add(node.actor)
+            search_stats["expanded"] += 1
 
             # get neighbors
             for movie, actor in neighbors_for_person(node.actor):
@@ -130,15 +211,157 @@ def shortest_path(source, target):
                         frontier.add(costar_node)
 
 
-def person_id_for_name(name):
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one frontier
+    from each end until they meet.
+
+    If no possible path, returns None.
+    """
+    search_stats["expanded"] = 0
+    if source == target:
+        return []
+
+    # maps each reached person to the (movie_id, person_id) step
+    # leading back towards the side's own starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # always grow the smaller frontier by one whole layer
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, reached, other = forward_frontier, forward, backward
+        else:
+            frontier, reached, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        for actor in frontier:
+            search_stats["expanded"] += 1
+            for movie, costar in neighbors_for_person(actor):
+                if costar in reached:
+                    continue
+                reached[costar] = (movie, actor)
+
+                # the first meeting is already a shortest path
+                if costar in other:
+                    return join_paths(forward, backward, costar)
+                next_frontier.append(costar)
+
+        if reached is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Returns the (movie_id, person_id) path through the person where
+    the forward and backward searches met.
+    """
+    path = []
+
+    # walk back from the meeting person to the source
+    actor = meeting
+    while forward[actor] is not None:
+        movie, parent = forward[actor]
+        path.append((movie, actor))
+        actor = parent
+    path.reverse()
+
+    # walk on from the meeting person to the target
+    actor = meeting
+    while backward[actor] is not None:
+        movie, child = backward[actor]
+        path.append((movie, child))
+        actor = child
+
+    return path
+
+
+def single_source_shortest_paths(source):
+    """
+    Returns (distances, parents) for every person reachable from source.
+
+    distances maps person_ids to their degrees of separation from source,
+    and parents maps every reached person_id other than source to the
+    (movie_id, person_id) pair it was reached from.
+    """
+    if graph is not None:
+        distances, parent_people, parent_movies = graph.single_source(
+            graph.person_index[source]
+        )
+        return (
+            {graph.person_ids[person]: distance
+             for person, distance in enumerate(distances) if distance != -1},
+            {graph.person_ids[person]: (graph.movie_ids[parent_movies[person]],
+                                        graph.person_ids[parent])
+             for person, parent in enumerate(parent_people) if parent != -1}
+        )
+
+    distances = {source: 0}
+    parents = {}
+    frontier = deque([source])
+
+    while frontier:
+        actor = frontier.popleft()
+        for movie, costar in neighbors_for_person(actor):
+            if costar not in distances:
+                distances[costar] = distances[actor] + 1
+                parents[costar] = (movie, actor)
+                frontier.append(costar)
+
+    return distances, parents
+
+
+def path_from_parents(parents, target):
+    """
+    Returns the (movie_id, person_id) path from the source to a reached
+    target, following the parents of single_source_shortest_paths.
+    """
+    path = []
+    while target in parents:
+        movie, parent = parents[target]
+        path.append((movie, target))
+        target = parent
+    path.reverse()
+    return path
+
+
+def person_ids_for_name(name, birth=None):
+    """
+    Returns the IMDB ids for a person's name, keeping
+    only people born in the given year if there is one.
+    """
+    person_ids = sorted(names.get(name.lower(), set()))
+    if birth is not None:
+        person_ids = [
+            person_id for person_id in person_ids
+            if people[person_id]["birth"] == str(birth)
+        ]
+    return person_ids
+
+
+def person_id_for_name(name, birth=None, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    An ambiguous name is narrowed down by birth year if given,
+    and otherwise asked about unless interactive is False,
+    in which case None is returned.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name, birth)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -161,6 +384,12 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[costar])
+            for movie, costar in graph.neighbors(graph.person_index[person_id])
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,103 @@
+import argparse
+import gc
+import multiprocessing
+import random
+import struct
+import sys
+import time
+from collections import Counter
+
+import degrees
+from graph import snapshot_is_fresh
+
+# Magic bytes at the start of a distances file
+DISTANCES_MAGIC = b"DEGDIST1"
+
+
+def search(source):
+    """
+    Returns the single-source BFS arrays for a person index
+    of the loaded graph.
+    """
+    return degrees.graph.single_source(source)
+
+
+def histogram(distances):
+    """
+    Returns a Counter of degrees of separation, with None
+    counting the people who cannot be reached.
+    """
+    counts = Counter(distances)
+    if -1 in counts:
+        counts[None] = counts.pop(-1)
+    return counts
+
+
+def write_results(f, sources, results, people):
+    """
+    Writes a distances file: the magic bytes, the number of people and
+    of sources, the source person indices, and then for every source its
+    distances, parent person and parent movie int32 arrays indexed by the
+    person order of the loaded graph.
+    """
+    f.write(DISTANCES_MAGIC)
+    f.write(struct.pack("<qq", people, len(sources)))
+    f.write(struct.pack(f"<{len(sources)}i", *sources))
+    for arrays in results:
+        for values in arrays:
+            f.write(values.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute degrees of separation from sources to everyone."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("sources", nargs="*", help="source person_ids")
+    parser.add_argument("--random", type=int, default=0,
+                        help="add this many random source people")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="forked processes sharing the loaded graph")
+    parser.add_argument("--output", help="write the distance arrays to this file")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory,
+                      backend=None if snapshot_is_fresh(args.directory) else "compact")
+    print("Data loaded.")
+
+    graph = degrees.graph
+    try:
+        sources = [graph.person_index[person_id] for person_id in args.sources]
+    except KeyError as e:
+        sys.exit(f"Person not found: {e.args[0]}")
+    sources += random.Random(0).sample(range(len(graph.person_ids)), args.random)
+    if not sources:
+        sys.exit("No source people given.")
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        gc.freeze()
+        with multiprocessing.get_context("fork").Pool(args.workers) as pool:
+            results = pool.map(search, sources)
+    else:
+        results = [search(source) for source in sources]
+    elapsed = time.perf_counter() - start
+
+    for source, (distances, _, _) in zip(sources, results):
+        counts = histogram(distances)
+        print(f"{graph.person_names[source]} ({graph.person_ids[source]}):")
+        for distance in sorted(d for d in counts if d is not None):
+            print(f"  {distance}: {counts[distance]}")
+        print(f"  not connected: {counts[None]}")
+
+    print(f"{len(sources)} sources in {elapsed:.2f} s.")
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            write_results(f, sources, results, len(graph.person_ids))
+        print(f"Distances written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
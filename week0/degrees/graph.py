@@ -0,0 +1,535 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Mapping, Sequence
+from itertools import accumulate
+
+from ingest import IngestStats, read_csv
+
+# File name of the binary snapshot written next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGREES2"
+
+# Snapshot sections, in file order, with "s" for string tables, stored
+# as int64 offsets followed by the strings, and "i" for int32 arrays
+SNAPSHOT_SECTIONS = [
+    ("person_ids", "s"), ("person_names", "s"), ("person_births", "s"),
+    ("movie_ids", "s"), ("movie_titles", "s"), ("movie_years", "s"),
+    ("person_offsets", "i"), ("person_movies", "i"),
+    ("movie_offsets", "i"), ("movie_people", "i"),
+    ("name_order", "i"), ("person_id_order", "i"), ("movie_id_order", "i"),
+]
+
+
+class CompactGraph():
+    """
+    Stores the degrees dataset with people and movies interned to dense
+    integer indices and their edges kept as CSR (compressed sparse row)
+    arrays: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are
+    movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 name_order=None, person_id_order=None, movie_id_order=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # person indices sorted by lowercase name
+        if name_order is None:
+            name_order = array("i", sorted(
+                range(len(person_names)), key=lambda p: person_names[p].lower()
+            ))
+        self.name_order = name_order
+
+        # person and movie indices sorted by id, if read from a snapshot
+        self.person_id_order = person_id_order
+        self.movie_id_order = movie_id_order
+
+        self._person_index = None
+        self._movie_index = None
+
+        # counts the people expanded by the most recent search
+        self.expanded = 0
+
+    @classmethod
+    def from_csv(cls, directory, stats=None):
+        """
+        Builds the graph straight from the CSV files in directory,
+        without going through the dictionaries of degrees.py,
+        counting rows read and rejected in an IngestStats.
+        """
+        if stats is None:
+            stats = IngestStats()
+
+        person_ids, person_names, person_births = [], [], []
+        path = f"{directory}/people.csv"
+        for chunk in read_csv(path, ("id", "name", "birth"), stats, ("birth",)):
+            for person_id, name, birth in chunk:
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        path = f"{directory}/movies.csv"
+        for chunk in read_csv(path, ("id", "title", "year"), stats, ("year",)):
+            for movie_id, title, year in chunk:
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+
+        person_index = index_of(person_ids)
+        movie_index = index_of(movie_ids)
+
+        # edges with an unknown person or movie are rejected
+        stars_people, stars_movies = array("i"), array("i")
+        path = f"{directory}/stars.csv"
+        for chunk in read_csv(path, ("person_id", "movie_id"), stats):
+            for person_id, movie_id in chunk:
+                person = person_index.get(person_id)
+                movie = movie_index.get(movie_id)
+                if person is not None and movie is not None:
+                    stars_people.append(person)
+                    stars_movies.append(movie)
+                else:
+                    stats.reject(path)
+
+        person_offsets, person_movies = build_csr(
+            stars_people, stars_movies, len(person_ids)
+        )
+        movie_offsets, movie_people = build_csr(
+            stars_movies, stars_people, len(movie_ids)
+        )
+
+        graph = cls(person_ids, person_names, person_births,
+                    movie_ids, movie_titles, movie_years,
+                    person_offsets, person_movies, movie_offsets, movie_people)
+        graph._person_index = person_index
+        graph._movie_index = movie_index
+        return graph
+
+    @classmethod
+    def load(cls, path):
+        """
+        Opens a snapshot written by save. Nothing is read up front: the
+        arrays are memory-mapped, and strings are decoded when used.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a degrees snapshot: {path}")
+
+        view = memoryview(data)
+        position = len(SNAPSHOT_MAGIC)
+        sections = {}
+        for name, kind in SNAPSHOT_SECTIONS:
+            size, count = struct.unpack_from("<qq", data, position)
+            position += 16
+            if kind == "s":
+                offsets = view[position:position + 8 * (count + 1)].cast("q")
+                position += 8 * (count + 1)
+                sections[name] = StringTable(view[position:position + size], offsets)
+            else:
+                sections[name] = view[position:position + size].cast("i")
+            position += padded(size)
+
+        return cls(**sections)
+
+    def save(self, path):
+        """
+        Writes the graph to a binary snapshot at path.
+        """
+        # graphs built from CSV files look ids up in dictionaries instead
+        ids = {"person_id_order": self.person_ids, "movie_id_order": self.movie_ids}
+
+        with open(path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            for name, kind in SNAPSHOT_SECTIONS:
+                values = getattr(self, name)
+                if values is None:
+                    values = id_order(ids[name])
+                if kind == "s":
+                    strings = [value.encode("utf-8") for value in values]
+                    offsets = array("q", accumulate(map(len, strings), initial=0)).tobytes()
+                    chunk = b"".join(strings)
+                else:
+                    offsets = b""
+                    chunk = array("i", values).tobytes()
+                f.write(struct.pack("<qq", len(chunk), len(values)))
+                f.write(offsets)
+                f.write(chunk)
+                f.write(bytes(padded(len(chunk)) - len(chunk)))
+
+    @property
+    def person_index(self):
+        """
+        Maps person_ids to their integer index.
+        """
+        if self._person_index is None:
+            if self.person_id_order is not None:
+                self._person_index = IdIndex(self.person_ids, self.person_id_order)
+            else:
+                self._person_index = index_of(self.person_ids)
+        return self._person_index
+
+    @property
+    def movie_index(self):
+        """
+        Maps movie_ids to their integer index.
+        """
+        if self._movie_index is None:
+            if self.movie_id_order is not None:
+                self._movie_index = IdIndex(self.movie_ids, self.movie_id_order)
+            else:
+                self._movie_index = index_of(self.movie_ids)
+        return self._movie_index
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices a person index starred in.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices who starred in a movie index.
+        """
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Returns (movie index, person index) pairs for people
+        who starred with a given person index.
+        """
+        neighbors = set()
+        for movie in self.movies_of(person):
+            for costar in self.stars_of(movie):
+                neighbors.add((movie, costar))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source person_id to the target person_id.
+
+        If no possible path, returns None.
+        """
+        self.expanded = 0
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if source == target:
+            return []
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+
+        # maps each reached person index to its (movie, person) parent
+        parents = {source: None}
+
+        # every star of a movie is reached the first time it is scanned
+        scanned = set()
+        frontier = deque([source])
+
+        while frontier:
+            person = frontier.popleft()
+            self.expanded += 1
+
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if movie in scanned:
+                    continue
+                scanned.add(movie)
+
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    costar = movie_people[j]
+                    if costar in parents:
+                        continue
+                    parents[costar] = (movie, person)
+                    if costar == target:
+                        return self.trace(parents, target)
+                    frontier.append(costar)
+
+        return None
+
+    def single_source(self, source):
+        """
+        Runs one BFS from a person index over the whole graph and returns
+        (distances, parent_people, parent_movies) arrays indexed by person,
+        with -1 for people who are unreachable or have no parent.
+        """
+        count = len(self.person_ids)
+        distances = array("i", [-1]) * count
+        parent_people = array("i", [-1]) * count
+        parent_movies = array("i", [-1]) * count
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        scanned = bytearray(len(self.movie_ids))
+
+        distances[source] = 0
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            distance = distances[person] + 1
+
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if scanned[movie]:
+                    continue
+                scanned[movie] = 1
+
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    costar = movie_people[j]
+                    if distances[costar] == -1:
+                        distances[costar] = distance
+                        parent_people[costar] = person
+                        parent_movies[costar] = movie
+                        frontier.append(costar)
+
+        return distances, parent_people, parent_movies
+
+    def trace(self, parents, person):
+        """
+        Returns the (movie_id, person_id) path from the search root to
+        person, following a map of person index to (movie, parent) pairs.
+        """
+        path = []
+        while parents[person] is not None:
+            movie, parent = parents[person]
+            path.append((self.movie_ids[movie], self.person_ids[person]))
+            person = parent
+        path.reverse()
+        return path
+
+
+class StringTable(Sequence):
+    """
+    Read-only list of the strings of a snapshot string table,
+    each decoded from the memory map when it is read.
+    """
+
+    def __init__(self, data, offsets):
+        # UTF-8 bytes of every string, one after another
+        self.data = data
+
+        # string i is data[offsets[i]:offsets[i + 1]]
+        self.offsets = offsets
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        data, offsets = self.data, self.offsets
+        for i in range(len(self)):
+            yield str(data[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class IdIndex(Mapping):
+    """
+    Read-only map of ids to their integer index, answered by
+    binary search over the indices sorted by id.
+    """
+
+    def __init__(self, ids, order):
+        self.ids = ids
+        self.order = order
+
+    def __getitem__(self, key):
+        order = self.order
+        i = bisect_left(order, key, key=self.ids.__getitem__)
+        if i < len(order) and self.ids[order[i]] == key:
+            return order[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view of a CompactGraph shaped like the people
+    dictionary of degrees.py.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie] for movie in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view of a CompactGraph shaped like the movies
+    dictionary of degrees.py.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person] for person in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only view of a CompactGraph shaped like the names
+    dictionary of degrees.py, answered by binary search over
+    the graph's name order.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._length = None
+
+    def lowercase_name(self, person):
+        """
+        Returns the lowercase name of a person index.
+        """
+        return self.graph.person_names[person].lower()
+
+    def __getitem__(self, name):
+        graph = self.graph
+        order = graph.name_order
+        i = bisect_left(order, name, key=self.lowercase_name)
+        person_ids = set()
+        while i < len(order) and self.lowercase_name(order[i]) == name:
+            person_ids.add(graph.person_ids[order[i]])
+            i += 1
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for person in self.graph.name_order:
+            name = self.lowercase_name(person)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot for a data directory.
+    """
+    return os.path.join(directory, SNAPSHOT)
+
+
+def snapshot_is_fresh(directory):
+    """
+    Returns True if the directory has a snapshot in the current
+    format newer than its CSV files.
+    """
+    try:
+        with open(snapshot_path(directory), "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return False
+        snapshot_time = os.path.getmtime(snapshot_path(directory))
+        return all(
+            os.path.getmtime(os.path.join(directory, filename)) < snapshot_time
+            for filename in ("people.csv", "movies.csv", "stars.csv")
+        )
+    except OSError:
+        return False
+
+
+def padded(size):
+    """
+    Rounds a section size up to the next multiple of 8 bytes.
+    """
+    return (size + 7) // 8 * 8
+
+
+def index_of(ids):
+    """
+    Maps every id in a list to its position.
+    """
+    return dict(zip(ids, range(len(ids))))
+
+
+def id_order(ids):
+    """
+    Returns the indices of a list of ids sorted by id.
+    """
+    return sorted(range(len(ids)), key=ids.__getitem__)
+
+
+def build_csr(sources, targets, count):
+    """
+    Returns the (offsets, edges) CSR arrays for edges from
+    sources[i] to targets[i] over count source indices.
+    """
+    degree = array("i", [0]) * count
+    for source in sources:
+        degree[source] += 1
+    offsets = array("i", accumulate(degree, initial=0))
+
+    edges = array("i", [0]) * len(sources)
+    position = array("i", offsets[:-1])
+    for source, target in zip(sources, targets):
+        edges[position[source]] = target
+        position[source] += 1
+
+    return offsets, edges
@@ -0,0 +1,197 @@
+import csv
+import gc
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rows parsed at a time before progress and memory are checked
+CHUNK_SIZE = 65536
+
+
+class IngestStats():
+    """
+    Counts the rows read and rejected from every CSV file,
+    with the time spent on each and the memory used.
+    """
+
+    def __init__(self, memory_budget=None):
+        # maps file names to their rows, rejected rows and seconds
+        self.files = {}
+
+        # largest growth of the resident set size allowed, in bytes
+        self.memory_budget = memory_budget
+
+        # resident set size before loading, in bytes
+        self.start_rss = current_rss()
+
+        # maps the names of indexes built over the data to their entries and bytes
+        self.indexes = {}
+
+    def start(self, path):
+        """
+        Starts counting the rows of a CSV file.
+        """
+        self.files[os.path.basename(path)] = {"rows": 0, "rejected": 0, "seconds": 0.0}
+
+    def add(self, path, rows, rejected, seconds):
+        """
+        Adds a chunk of rows read from a CSV file.
+        """
+        counts = self.files[os.path.basename(path)]
+        counts["rows"] += rows
+        counts["rejected"] += rejected
+        counts["seconds"] += seconds
+
+    def reject(self, path, count=1):
+        """
+        Counts rows of a CSV file that were read but could not be used.
+        """
+        self.files[os.path.basename(path)]["rejected"] += count
+
+    def add_index(self, name, entries, size):
+        """
+        Records the number of entries and size in bytes of an index.
+        """
+        self.indexes[name] = {"entries": entries, "bytes": size}
+
+    def memory_used(self):
+        """
+        Returns the bytes the resident set size has grown by since
+        loading started, or None where it cannot be measured.
+        """
+        rss = current_rss()
+        if rss is None or self.start_rss is None:
+            return None
+        return rss - self.start_rss
+
+    def check_memory(self):
+        """
+        Raises MemoryError once loading has used more memory than the budget.
+        """
+        used = self.memory_used()
+        if self.memory_budget is not None and used is not None and used > self.memory_budget:
+            raise MemoryError(
+                f"Loading used {used / 2 ** 20:.0f} MiB, "
+                f"over the budget of {self.memory_budget / 2 ** 20:.0f} MiB"
+            )
+
+    def report(self):
+        """
+        Returns one line per CSV file, one per index built
+        and one for memory use.
+        """
+        lines = []
+        for name, counts in self.files.items():
+            rate = counts["rows"] / counts["seconds"] if counts["seconds"] > 0 else 0.0
+            lines.append(f"{name}: {counts['rows']} rows, {counts['rejected']} rejected, "
+                         f"{rate:.0f} rows/s")
+        lines += self.report_indexes()
+        used = self.memory_used()
+        if used is not None:
+            lines.append(f"memory used: {used / 2 ** 20:.1f} MiB")
+        peak = peak_rss()
+        if peak is not None:
+            lines.append(f"peak RSS: {peak / 2 ** 20:.1f} MiB")
+        return lines
+
+    def report_indexes(self):
+        """
+        Returns one line per index built.
+        """
+        return [
+            f"{name} index: {index['entries']} entries, {index['bytes'] / 2 ** 20:.1f} MiB"
+            for name, index in self.indexes.items()
+        ]
+
+
+def read_csv(path, columns, stats, interned=(), chunk_size=CHUNK_SIZE):
+    """
+    Streams a CSV file as chunks of tuples holding the given columns.
+
+    Strings in the interned columns are interned, so repeated years
+    or ids share one object. Rows with the wrong number of fields are
+    rejected.
+    """
+    stats.start(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            positions = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{path} needs the columns {', '.join(columns)}")
+        width = len(header)
+        fields = itemgetter(*positions) if len(positions) > 1 else lambda row: (row[positions[0]],)
+        shared = [i for i, column in enumerate(columns) if column in interned]
+
+        while True:
+            start = time.perf_counter()
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+
+            chunk = [fields(row) for row in rows if len(row) == width]
+            if shared and chunk:
+
+                # intern a column at a time rather than a field at a time
+                values = list(zip(*chunk))
+                for i in shared:
+                    values[i] = map(sys.intern, values[i])
+                chunk = list(zip(*values))
+            stats.add(path, len(rows), len(rows) - len(chunk), time.perf_counter() - start)
+
+            # time spent by the caller on the chunk counts towards the file
+            start = time.perf_counter()
+            yield chunk
+            stats.add(path, 0, 0, time.perf_counter() - start)
+            stats.check_memory()
+
+
+@contextmanager
+def paused_gc():
+    """
+    Turns the cyclic garbage collector off while loading. The rows
+    loaded form no reference cycles, but every container allocated
+    would otherwise count towards the next collection, and each
+    collection walks all of the data loaded so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def current_rss():
+    """
+    Returns the resident set size of this process in bytes, falling
+    back to the peak where the current size cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in bytes,
+    or None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
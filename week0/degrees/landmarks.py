@@ -0,0 +1,245 @@
+import heapq
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import degrees
+from graph import snapshot_is_fresh
+
+# File name of the landmark table written next to the CSV files
+LANDMARKS = "landmarks.bin"
+LANDMARKS_MAGIC = b"DEGLAND2"
+
+
+class Landmarks():
+    """
+    BFS distances from K landmark people to everyone in a CompactGraph.
+
+    By the triangle inequality, |d(L, s) - d(L, t)| <= d(s, t) <=
+    d(L, s) + d(L, t) for every landmark L, which bounds degrees of
+    separation in O(K) and gives A* a consistent heuristic (ALT).
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+
+        # person indices of the landmarks
+        self.landmarks = landmarks
+
+        # one array per landmark of distances indexed by person, -1 if unreachable
+        self.distances = distances
+
+        # counts the people expanded by the most recent search
+        self.expanded = 0
+
+    @classmethod
+    def build(cls, graph, k):
+        """
+        Picks k landmarks, starting from the person with the most movies
+        and then always taking the reachable person farthest from every
+        landmark so far, and runs a BFS from each one.
+        """
+        count = len(graph.person_ids)
+        offsets = graph.person_offsets
+        first = max(range(count), key=lambda person: offsets[person + 1] - offsets[person])
+
+        landmarks = array("i")
+        distances = []
+        nearest = array("i", [-1]) * count
+        landmark = first
+
+        for _ in range(min(k, count)):
+            landmarks.append(landmark)
+            landmark_distances = graph.single_source(landmark)[0]
+            distances.append(landmark_distances)
+
+            for person, distance in enumerate(landmark_distances):
+                if distance != -1 and (nearest[person] == -1 or distance < nearest[person]):
+                    nearest[person] = distance
+
+            landmark = max(range(count), key=nearest.__getitem__)
+            if nearest[landmark] <= 0:
+                break
+
+        return cls(graph, landmarks, distances)
+
+    @classmethod
+    def load(cls, graph, path):
+        """
+        Reads a landmark table written by save for the same graph,
+        raising ValueError if it was built for any other graph, since
+        its bounds would no longer hold.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(LANDMARKS_MAGIC)) != LANDMARKS_MAGIC:
+                raise ValueError(f"Not a landmark table: {path}")
+            k, count, edges, checksum = struct.unpack("<qqqq", f.read(32))
+            if (count, edges, checksum) != fingerprint(graph):
+                raise ValueError(f"Landmark table does not match the graph: {path}")
+
+            landmarks = array("i")
+            landmarks.fromfile(f, k)
+            distances = []
+            for _ in range(k):
+                landmark_distances = array("i")
+                landmark_distances.fromfile(f, count)
+                distances.append(landmark_distances)
+
+        return cls(graph, landmarks, distances)
+
+    def save(self, path):
+        """
+        Writes the landmark table to path.
+        """
+        with open(path, "wb") as f:
+            f.write(LANDMARKS_MAGIC)
+            f.write(struct.pack("<qqqq", len(self.landmarks), *fingerprint(self.graph)))
+            self.landmarks.tofile(f)
+            for landmark_distances in self.distances:
+                landmark_distances.tofile(f)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two person indices, with upper None if no landmark reaches both,
+        or None if a landmark shows they are not connected.
+        """
+        lower = 0
+        upper = None
+        for landmark_distances in self.distances:
+            s = landmark_distances[source]
+            t = landmark_distances[target]
+            if s == -1 and t == -1:
+                continue
+            elif s == -1 or t == -1:
+                return None
+            lower = max(lower, abs(s - t))
+            if upper is None or s + t < upper:
+                upper = s + t
+        return lower, upper
+
+    def estimate(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person_ids, or None if they are not connected.
+        """
+        index = self.graph.person_index
+        return self.bounds(index[source], index[target])
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target, found by A* search guided
+        by the landmark lower bounds.
+
+        If no possible path, returns None.
+        """
+        self.expanded = 0
+        graph = self.graph
+        source = graph.person_index[source]
+        target = graph.person_index[target]
+        if source == target:
+            return []
+        if self.bounds(source, target) is None:
+            return None
+
+        person_offsets, person_movies = graph.person_offsets, graph.person_movies
+        movie_offsets, movie_people = graph.movie_offsets, graph.movie_people
+        target_distances = [
+            (landmark_distances, landmark_distances[target])
+            for landmark_distances in self.distances
+        ]
+
+        def heuristic(person):
+            h = 0
+            for landmark_distances, t in target_distances:
+                s = landmark_distances[person]
+                if s == -1 and t != -1:
+                    return None
+                if s != -1 and t != -1 and abs(s - t) > h:
+                    h = abs(s - t)
+            return h
+
+        # maps each reached person index to its (movie, person) parent
+        parents = {source: None}
+        costs = {source: 0}
+        expanded = set()
+        # ties on the estimate go to the deepest person first
+        frontier = [(heuristic(source), 0, source)]
+
+        while frontier:
+            _, depth, person = heapq.heappop(frontier)
+            cost = -depth
+            if person in expanded:
+                continue
+            expanded.add(person)
+            self.expanded += 1
+
+            if person == target:
+                return graph.trace(parents, target)
+
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    costar = movie_people[j]
+                    if costar in expanded:
+                        continue
+                    if costar in costs and costs[costar] <= cost + 1:
+                        continue
+                    h = heuristic(costar)
+
+                    # a landmark reaches the target but not this costar
+                    if h is None:
+                        continue
+                    costs[costar] = cost + 1
+                    parents[costar] = (movie, person)
+                    heapq.heappush(frontier, (cost + 1 + h, -cost - 1, costar))
+
+        return None
+
+
+def fingerprint(graph):
+    """
+    Returns (people, edges, checksum) identifying the shape of a
+    CompactGraph, the checksum covering every offset and edge.
+    """
+    checksum = 0
+    for section in (graph.person_offsets, graph.person_movies,
+                    graph.movie_offsets, graph.movie_people):
+        checksum = zlib.crc32(section, checksum)
+    return len(graph.person_ids), len(graph.person_movies), checksum
+
+
+def landmarks_path(directory):
+    """
+    Returns the path of the landmark table for a data directory.
+    """
+    return os.path.join(directory, LANDMARKS)
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [landmarks]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    degrees.load_data(directory, backend=None if snapshot_is_fresh(directory) else "compact")
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    table = Landmarks.build(degrees.graph, k)
+    print(f"{len(table.landmarks)} landmarks chosen in {time.perf_counter() - start:.2f} s:")
+    for landmark in table.landmarks:
+        print(f"  {degrees.graph.person_names[landmark]} ({degrees.graph.person_ids[landmark]})")
+
+    path = landmarks_path(directory)
+    table.save(path)
+    print(f"Landmark table written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class NameIndex():
+    """
+    Sorted index of lowercase names to person_ids, answering exact,
+    prefix and edit-distance lookups without scanning every name.
+    """
+
+    def __init__(self, entries, max_distance=1, stats=None):
+        """
+        Builds the index from (name, person_id) pairs. Fuzzy lookups
+        find names up to max_distance edits away. The size of the
+        deletion index is added to stats, an IngestStats, if given.
+        """
+        entries = sorted((name.lower(), person_id) for name, person_id in entries)
+        self.keys = [name for name, _ in entries]
+        self.person_ids = [person_id for _, person_id in entries]
+        self.max_distance = max_distance
+
+        self.stats = stats
+
+        # hash table from every name with up to max_distance characters
+        # deleted to the positions in keys of the distinct names it came
+        # from, as bucket offsets into one array of positions, built on
+        # the first fuzzy lookup
+        self._offsets = None
+        self._positions = None
+
+    @classmethod
+    def from_people(cls, people, max_distance=1, stats=None):
+        """
+        Builds the index from a people dictionary of degrees.py.
+        """
+        return cls(
+            ((person["name"], person_id) for person_id, person in people.items()),
+            max_distance, stats
+        )
+
+    @classmethod
+    def from_graph(cls, graph, max_distance=1, stats=None):
+        """
+        Builds the index from a CompactGraph without going through its views.
+        """
+        return cls(
+            ((graph.person_names[person], graph.person_ids[person])
+             for person in graph.name_order),
+            max_distance, stats
+        )
+
+    def exact(self, name):
+        """
+        Returns the person_ids with exactly this name, ignoring case.
+        """
+        name = name.lower()
+        return self.person_ids[bisect_left(self.keys, name):bisect_right(self.keys, name)]
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns (name, person_id) pairs for names starting with prefix,
+        in name order, at most limit of them.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff")
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self.keys[start:end], self.person_ids[start:end]))
+
+    def fuzzy(self, name, max_distance=None, limit=None):
+        """
+        Returns (distance, name, person_id) triples for names within
+        max_distance edits of name, closest first, at most limit of them.
+        """
+        name = name.lower()
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        # buckets may hold names from other variants, which the edit
+        # distance rules out
+        positions = set()
+        offsets, entries = self.deletes()
+        buckets = len(offsets) - 1
+        for variant in deletions(name, max_distance):
+            bucket = hash(variant) % buckets
+            positions.update(entries[offsets[bucket]:offsets[bucket + 1]])
+
+        matches = []
+        for candidate in {self.keys[position] for position in positions}:
+            distance = edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                for person_id in self.exact(candidate):
+                    matches.append((distance, candidate, person_id))
+        matches.sort()
+        return matches[:limit] if limit is not None else matches
+
+    def deletes(self):
+        """
+        Returns the deletion index of the distinct names as (offsets,
+        positions) arrays, building it if needed: the names in bucket b
+        are keys[i] for i in positions[offsets[b]:offsets[b + 1]].
+        """
+        if self._offsets is None:
+            firsts = [i for i, name in enumerate(self.keys) if i == 0 or name != self.keys[i - 1]]
+
+            # about one bucket per variant, a name having at most one
+            # variant per character deleted
+            buckets = max(1, sum(len(self.keys[i]) + 1 for i in firsts))
+
+            # (bucket, position) pairs, kept as integers only so that no
+            # variant string outlives the name it was made from
+            pair_buckets = array("i")
+            pair_positions = array("i")
+            for i in firsts:
+                for variant in deletions(self.keys[i], self.max_distance):
+                    pair_buckets.append(hash(variant) % buckets)
+                    pair_positions.append(i)
+
+            # counting sort of the positions by bucket
+            offsets = array("i", [0]) * (buckets + 1)
+            for bucket in pair_buckets:
+                offsets[bucket + 1] += 1
+            for bucket in range(buckets):
+                offsets[bucket + 1] += offsets[bucket]
+            positions = array("i", [0]) * len(pair_positions)
+            fill = array("i", offsets)
+            for bucket, i in zip(pair_buckets, pair_positions):
+                positions[fill[bucket]] = i
+                fill[bucket] += 1
+
+            self._offsets, self._positions = offsets, positions
+            if self.stats is not None:
+                self.stats.add_index("name deletions", len(positions), self.deletes_size())
+        return self._offsets, self._positions
+
+    def deletes_size(self):
+        """
+        Returns the size in bytes of the deletion index, 0 if not built.
+        """
+        if self._offsets is None:
+            return 0
+        return (len(self._offsets) * self._offsets.itemsize
+                + len(self._positions) * self._positions.itemsize)
+
+
+def deletions(word, max_distance):
+    """
+    Returns every string made by deleting up to max_distance
+    characters from word, including word itself.
+    """
+    variants = {word}
+    layer = {word}
+    for _ in range(max_distance):
+        layer = {w[:i] + w[i + 1:] for w in layer for i in range(len(w))}
+        variants |= layer
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between a and b, or limit + 1
+    as soon as it is known to be larger than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
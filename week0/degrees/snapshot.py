@@ -0,0 +1,32 @@
+import sys
+import time
+
+from graph import CompactGraph, snapshot_path
+from ingest import IngestStats
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    # parse the CSV files once and write the snapshot next to them
+    print("Loading data...")
+    start = time.perf_counter()
+    stats = IngestStats()
+    graph = CompactGraph.from_csv(directory, stats)
+    print(f"Data loaded in {time.perf_counter() - start:.2f} s.")
+    for line in stats.report():
+        print(f"  {line}")
+
+    path = snapshot_path(directory)
+    graph.save(path)
+    print(f"Snapshot written to {path}.")
+
+    start = time.perf_counter()
+    CompactGraph.load(path)
+    print(f"Snapshot opens in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, parent, movie, actor):
         self.parent = parent
@@ -37,3 +40,46 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    def __init__(self):
+        self.frontier = deque()
+
+        # counts frontier nodes per actor for constant time lookups
+        self.actors = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.actors[node.actor] = self.actors.get(node.actor, 0) + 1
+
+    def contains_actor(self, actor):
+        return actor in self.actors
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.forget(node)
+            return node
+
+    def forget(self, node):
+        if self.actors[node.actor] == 1:
+            del self.actors[node.actor]
+        else:
+            self.actors[node.actor] -= 1
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.forget(node)
+            return node
@@ -0,0 +1,120 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def random_agent(rng):
+    """
+    Returns an agent playing uniformly random moves from rng.
+    """
+    return lambda board: rng.choice(sorted(ttt.actions(board)))
+
+
+# Maps agent names to functions making an agent from a random generator
+AGENTS = {
+    "minimax": lambda rng: lambda board: ttt.minimax(board, memoize=False, use_book=False),
+    "memoized": lambda rng: lambda board: ttt.minimax(board, use_book=False),
+    "book": lambda rng: ttt.minimax,
+    "bitboard": lambda rng: lambda board: bitboard.minimax(bitboard.from_board(board)),
+    "random": random_agent,
+}
+
+
+def play(agents, latencies):
+    """
+    Plays one game between agents, a dictionary of X and O to agents,
+    adding every move's time to latencies and returning the winner.
+    """
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        mark = ttt.player(board)
+        start = time.perf_counter()
+        move = agents[mark](board)
+        latencies[mark].append(time.perf_counter() - start)
+        board = ttt.result(board, move)
+    return ttt.winner(board)
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+def run(first, second, games, seed=0):
+    """
+    Plays games between two named agents, swapping X and O every game,
+    and returns a report of results and move latencies per agent.
+    """
+    rng = random.Random(seed)
+    agents = {first: AGENTS[first](rng), second: AGENTS[second](rng)}
+    names = [first, second] if first != second else [f"{first} (1)", f"{second} (2)"]
+    results = {name: {"wins": 0, "losses": 0, "ties": 0} for name in names}
+    latencies = {name: [] for name in names}
+
+    for game in range(games):
+        x, o = (0, 1) if game % 2 == 0 else (1, 0)
+        seats = {ttt.X: names[x], ttt.O: names[o]}
+        moves = {ttt.X: [], ttt.O: []}
+        win = play({
+            ttt.X: agents[(first, second)[x]],
+            ttt.O: agents[(first, second)[o]],
+        }, moves)
+
+        for mark, name in seats.items():
+            latencies[name] += moves[mark]
+            if win is None:
+                results[name]["ties"] += 1
+            elif win == mark:
+                results[name]["wins"] += 1
+            else:
+                results[name]["losses"] += 1
+
+    report = {"games": games, "seed": seed, "agents": {}}
+    for name in names:
+        times = sorted(latencies[name])
+        report["agents"][name] = {
+            **results[name],
+            "moves": len(times),
+            "mean_ms": sum(times) / len(times) * 1000 if times else None,
+            "p50_ms": percentile(times, 0.50) * 1000 if times else None,
+            "p99_ms": percentile(times, 0.99) * 1000 if times else None,
+            "max_ms": times[-1] * 1000 if times else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe agents against each other.")
+    parser.add_argument("first", choices=AGENTS)
+    parser.add_argument("second", choices=AGENTS)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args.first, args.second, args.games, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    # optimal agents never lose to each other
+    optimal = {"minimax", "memoized", "book", "bitboard"}
+    if args.first in optimal and args.second in optimal:
+        if any(result["losses"] for result in report["agents"].values()):
+            sys.exit("An optimal agent lost a game.")
+
+
+if __name__ == "__main__":
+    main()
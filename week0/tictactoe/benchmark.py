@@ -0,0 +1,93 @@
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+
+def count_games(engine, board):
+    """
+    Returns the number of boards in the full game tree below board.
+    """
+    if engine.terminal(board):
+        return 1
+    return 1 + sum(
+        count_games(engine, engine.result(board, action))
+        for action in engine.actions(board)
+    )
+
+
+def benchmark_engines(repeat):
+    """
+    Times a walk of the full game tree and a minimax search from
+    the empty board with the list engine and the bitboard engine.
+    """
+    engines = {
+        "list": (ttt, ttt.initial_state(), lambda board: ttt.minimax(board, memoize=False, use_book=False)),
+        "bitboard": (bitboard, bitboard.initial_state(), bitboard.minimax),
+    }
+    for name, (engine, board, minimax) in engines.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            nodes = count_games(engine, board)
+        walk = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            move = minimax(board)
+        search = (time.perf_counter() - start) / repeat
+
+        print(f"{name:>10} full tree: {nodes} boards in {walk:7.3f} s "
+              f"minimax: {move} in {search:7.3f} s")
+
+
+def benchmark_parallel(m, n, k, depth, radius=None):
+    """
+    Times a parallel root-split search of an opening position with
+    1, 2, 4 and 8 workers, checking they all choose the same move.
+    """
+    game = mnk.Game(m, n, k, radius)
+
+    # a fixed opening, so there are stones for the radius to work from
+    board = game.initial_state()
+    for action in [(m // 2, n // 2), (m // 2, n // 2 + 1)]:
+        board = game.result(board, action)
+
+    baseline = None
+    moves = set()
+    for workers in (1, 2, 4, 8):
+
+        # start the pool outside the timing, as a server would keep it
+        pool = game.worker_pool(workers) if workers > 1 else None
+        start = time.perf_counter()
+        move = game.parallel_minimax(board, depth, workers, pool=pool)
+        elapsed = time.perf_counter() - start
+        if pool is not None:
+            pool.close()
+            pool.join()
+        moves.add(move)
+        if baseline is None:
+            baseline = elapsed
+        print(f"{workers} workers: {move} in {elapsed:7.3f} s, "
+              f"speedup {baseline / elapsed:5.2f}x")
+
+    if len(moves) > 1:
+        sys.exit(f"Workers disagree on the move: {moves}")
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "parallel":
+        if len(sys.argv) not in (6, 7):
+            sys.exit("Usage: python benchmark.py parallel m n k depth [radius]")
+        benchmark_parallel(*(int(arg) for arg in sys.argv[2:]))
+        return
+
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [repeat | parallel m n k depth [radius]]")
+    repeat = int(sys.argv[1]) if len(sys.argv) == 2 else 1
+    benchmark_engines(repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A state is a pair (x, o) of 9-bit integers, where bit 3 * i + j
+is set if that player has a mark on cell (i, j).
+"""
+
+import tictactoe as ttt
+
+FULL = 0b111111111
+
+# Bit masks of every row, column and diagonal
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return 0, 0
+
+
+def from_board(board):
+    """
+    Returns the state of a list of lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == ttt.X:
+                x |= 1 << (3 * i + j)
+            elif cell == ttt.O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(state):
+    """
+    Returns the list of lists board of a state.
+    """
+    x, o = state
+    board = ttt.initial_state()
+    for cell in range(9):
+        if x >> cell & 1:
+            board[cell // 3][cell % 3] = ttt.X
+        elif o >> cell & 1:
+            board[cell // 3][cell % 3] = ttt.O
+    return board
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a state.
+    """
+    x, o = state
+    return ttt.X if x.bit_count() == o.bit_count() else ttt.O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the state.
+    """
+    x, o = state
+    taken = x | o
+    return {(cell // 3, cell % 3) for cell in range(9) if not taken >> cell & 1}
+
+
+def result(state, action):
+    """
+    Returns the state that results from making move (i, j) on the state.
+    """
+    x, o = state
+    move = 1 << (3 * action[0] + action[1])
+    if (x | o) & move:
+        raise Exception("Invalid Move")
+    if x.bit_count() == o.bit_count():
+        return x | move, o
+    return x, o | move
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    for line in LINES:
+        if x & line == line:
+            return ttt.X
+        if o & line == line:
+            return ttt.O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return (x | o) == FULL or winner(state) is not None
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    win = winner(state)
+    if win == ttt.X:
+        return 1
+    elif win == ttt.O:
+        return -1
+    return 0
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player on the state.
+    """
+    if player(state) == ttt.X:
+        return max_value(state)[1]
+    return min_value(state)[1]
+
+
+def max_value(state):
+    # check if game ended
+    if terminal(state):
+        return utility(state), None
+
+    v = -2
+    next_move = None
+    for action in actions(state):
+        new_v = min_value(result(state, action))[0]
+        if new_v > v:
+            v = new_v
+            next_move = action
+            if v == 1:
+                break
+    return v, next_move
+
+
+def min_value(state):
+    # check if game ended
+    if terminal(state):
+        return utility(state), None
+
+    v = 2
+    next_move = None
+    for action in actions(state):
+        new_v = max_value(result(state, action))[0]
+        if new_v < v:
+            v = new_v
+            next_move = action
+            if v == -1:
+                break
+    return v, next_move
@@ -0,0 +1,63 @@
+import sys
+from array import array
+
+import tictactoe as ttt
+
+
+def build_book():
+    """
+    Solves every reachable position that is not over, once per
+    symmetry class, and returns a dictionary of canonical keys
+    to the optimal move on the canonical board.
+    """
+    book = {}
+    seen = set()
+    frontier = [ttt.initial_state()]
+
+    while frontier:
+        board = frontier.pop()
+        key, s = ttt.canonical(board)
+        if key in seen:
+            continue
+        seen.add(key)
+        if ttt.terminal(board):
+            continue
+
+        # solve the canonical board itself
+        canonical_board = ttt.initial_state()
+        for i in range(3):
+            for j in range(3):
+                new_i, new_j = ttt.SYMMETRIES[s](i, j)
+                canonical_board[new_i][new_j] = board[i][j]
+        book[key] = ttt.minimax(canonical_board, use_book=False)
+
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+
+    print(f"{len(seen)} positions up to symmetry, {len(book)} still in play.")
+    return book
+
+
+def write_book(book, path):
+    """
+    Writes the book as sorted uint32 entries of key * 9 + cell.
+    """
+    entries = array("I", sorted(key * 9 + 3 * i + j for key, (i, j) in book.items()))
+    if sys.byteorder == "big":
+        entries.byteswap()
+    with open(path, "wb") as f:
+        f.write(entries.tobytes())
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_PATH
+
+    book = build_book()
+    write_book(book, path)
+    print(f"Opening book written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
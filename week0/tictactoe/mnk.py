@@ -0,0 +1,476 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalised to an m x n board won by k in a row, such as
+4x4 with k = 4 or 15x15 gomoku with k = 5. Boards are lists of lists
+of X, O and EMPTY like in tictactoe.py, and Game(3, 3, 3) plays
+ordinary Tic Tac Toe.
+"""
+
+import multiprocessing
+import random
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a win, less the number of moves taken to reach it
+WIN = 10 ** 9
+
+# Nodes searched between checks of the time budget
+CHECK_EVERY = 1024
+
+# Game searched by the current worker process of a parallel search
+worker_game = None
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search that has run out of time.
+    """
+
+
+class Game():
+    """
+    Rules and search for one board size and line length.
+    """
+
+    def __init__(self, m=3, n=3, k=3, radius=None):
+        """
+        Sets up an m-row, n-column board won by k in a row. With a radius,
+        the search only tries empty cells within that many cells of a
+        mark, which keeps large boards like gomoku searchable.
+        """
+        if k > max(m, n):
+            raise ValueError("k cannot be longer than the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.radius = radius
+
+        # every line of k cells, as lists of cells (i, j)
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    window = [(i + s * di, j + s * dj) for s in range(k)]
+                    if all(0 <= a < m and 0 <= b < n for a, b in window):
+                        self.windows.append(window)
+
+        # maps every cell to the indices of the windows through it
+        self.windows_of = {(i, j): [] for i in range(m) for j in range(n)}
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.windows_of[cell].append(w)
+
+        # heuristic value of a window holding c marks of only one player
+        self.weights = [0] + [10 ** c for c in range(1, k)] + [0]
+
+        # random bits per cell and mark for Zobrist hashing of boards
+        rng = random.Random(0)
+        self.zobrist = {
+            (cell, mark): rng.getrandbits(64)
+            for cell in self.windows_of for mark in (X, O)
+        }
+
+        # maps board hashes to the best move found for them,
+        # used to try that move first in the next search
+        self.best_moves = {}
+
+        # counts the nodes visited by the most recent search
+        self.nodes = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return X if x_count == o_count else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {
+            (i, j) for i in range(self.m) for j in range(self.n)
+            if board[i][j] is EMPTY
+        }
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise Exception("Invalid Move")
+        result_board = [row[:] for row in board]
+        result_board[i][j] = self.player(board)
+        return result_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for window in self.windows:
+            first = board[window[0][0]][window[0][1]]
+            if first is not EMPTY and all(board[i][j] == first for i, j in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(
+            cell is not EMPTY for row in board for cell in row
+        )
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        win = self.winner(board)
+        if win == X:
+            return 1
+        elif win == O:
+            return -1
+        return 0
+
+    def minimax(self, board, time_limit=None, max_depth=None):
+        """
+        Returns the best action for the current player on the board.
+
+        Searches with alpha-beta at increasing depths, scoring boards at
+        the depth cutoff with the heuristic evaluation, until the game
+        is solved, max_depth is reached, or time_limit seconds run out,
+        in which case the move from the deepest finished depth is used.
+        """
+        state = GameState(self, board)
+        if state.winner() is not None or state.empty == 0:
+            return None
+
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        limit = state.empty if max_depth is None else min(max_depth, state.empty)
+        self.nodes = 0
+        best = self.candidates(state)[0]
+
+        for depth in range(1, limit + 1):
+            try:
+                value, move = self.search_root(state, depth, deadline)
+            except SearchTimeout:
+                break
+            best = move
+
+            # stop once the game is decided either way
+            if abs(value) > WIN - self.m * self.n:
+                break
+
+        return best
+
+    def parallel_minimax(self, board, depth, workers=4, bounds=True, pool=None):
+        """
+        Returns the best action found by a depth-move alpha-beta search
+        with the moves at the root split across worker processes.
+
+        With bounds, the first ordered move is searched here and its
+        value is passed to the workers as the alpha bound for the other
+        moves. Ties go to the earliest move in order, so the action does
+        not depend on the number of workers. A pool made by worker_pool
+        can be reused across calls.
+        """
+        state = GameState(self, board)
+        if state.winner() is not None or state.empty == 0:
+            return None
+        depth = min(depth, state.empty)
+        moves = self.ordered(state)
+        self.nodes = 0
+
+        alpha, beta = -WIN - 1, WIN + 1
+        values = []
+        if bounds:
+            alpha = self.search_move(board, moves[0], depth, alpha, beta)
+            values.append(alpha)
+            rest = moves[1:]
+        else:
+            rest = moves
+        tasks = [(board, action, depth, alpha, beta) for action in rest]
+
+        if workers <= 1 and pool is None:
+            values += [self.search_move(*task) for task in tasks]
+        elif pool is not None:
+            values += pool.map(search_move, tasks)
+        else:
+            with self.worker_pool(workers) as pool:
+                values += pool.map(search_move, tasks)
+
+        best = 0
+        for i, value in enumerate(values):
+            if value > values[best]:
+                best = i
+        return moves[best]
+
+    def search_move(self, board, action, depth, alpha, beta):
+        """
+        Returns the value for the side to move of playing action on the
+        board, searching depth moves in all with an (alpha, beta) window.
+        """
+        state = GameState(self, board)
+        state.make(action)
+        return -self.negamax(state, depth - 1, -beta, -alpha, 1, None)
+
+    def worker_pool(self, workers):
+        """
+        Returns a process pool whose workers search this game.
+        """
+        return multiprocessing.Pool(
+            workers, initializer=start_worker,
+            initargs=(self.m, self.n, self.k, self.radius)
+        )
+
+    def search_root(self, state, depth, deadline):
+        """
+        Returns (value, action) of an alpha-beta search of depth moves
+        from the side to move.
+        """
+        alpha, beta = -WIN - 1, WIN + 1
+        best = None
+        for action in self.ordered(state):
+            state.make(action)
+            try:
+                value = -self.negamax(state, depth - 1, -beta, -alpha, 1, deadline)
+            finally:
+                state.unmake()
+            if best is None or value > alpha:
+                alpha = value
+                best = action
+        self.best_moves[state.hash] = best
+        return alpha, best
+
+    def negamax(self, state, depth, alpha, beta, ply, deadline):
+        """
+        Returns the value of the state for the side to move, searching
+        depth more moves with alpha-beta pruning.
+        """
+        self.nodes += 1
+        if deadline is not None and self.nodes % CHECK_EVERY == 0:
+            if time.perf_counter() > deadline:
+                raise SearchTimeout
+
+        # the player who just moved has won
+        if state.winner() is not None:
+            return ply - WIN
+        if state.empty == 0:
+            return 0
+        if depth == 0:
+            return state.score if state.turn == X else -state.score
+
+        best = None
+        for action in self.ordered(state):
+            state.make(action)
+            try:
+                value = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1, deadline)
+            finally:
+                state.unmake()
+            if value > alpha:
+                alpha = value
+                best = action
+                if alpha >= beta:
+                    break
+
+        if best is not None:
+            self.best_moves[state.hash] = best
+        return alpha
+
+    def candidates(self, state):
+        """
+        Returns the empty cells worth trying on the state.
+        """
+        cells = state.cells
+        empty = [
+            (i, j) for i in range(self.m) for j in range(self.n)
+            if cells[i][j] is EMPTY
+        ]
+        if self.radius is None or state.empty == self.m * self.n:
+            return empty
+
+        r = self.radius
+        near = [
+            (i, j) for i, j in empty
+            if any(
+                cells[a][b] is not EMPTY
+                for a in range(max(0, i - r), min(self.m, i + r + 1))
+                for b in range(max(0, j - r), min(self.n, j + r + 1))
+            )
+        ]
+        return near or empty
+
+    def ordered(self, state):
+        """
+        Returns the candidate moves, best first: the move that was best
+        here in an earlier search, then the moves touching the most
+        promising lines for either player.
+        """
+        counts = state.counts
+        windows_of = self.windows_of
+
+        def promise(action):
+            total = 0
+            for w in windows_of[action]:
+                x, o = counts[X][w], counts[O][w]
+                if o == 0:
+                    total += (x + 1) * (x + 1)
+                if x == 0:
+                    total += (o + 1) * (o + 1)
+            return total
+
+        moves = sorted(self.candidates(state), key=promise, reverse=True)
+        best = self.best_moves.get(state.hash)
+        if best in moves:
+            moves.remove(best)
+            moves.insert(0, best)
+        return moves
+
+
+class GameState():
+    """
+    Mutable board for search, keeping per-line mark counts, the
+    heuristic score and a Zobrist hash up to date as moves are
+    made and unmade.
+    """
+
+    def __init__(self, game, board):
+        self.game = game
+        self.cells = [[EMPTY] * game.n for _ in range(game.m)]
+        self.counts = {X: [0] * len(game.windows), O: [0] * len(game.windows)}
+
+        # complete lines per player
+        self.lines = {X: 0, O: 0}
+
+        # heuristic value of the board for X
+        self.score = 0
+        self.hash = 0
+        self.empty = game.m * game.n
+        self.turn = X
+        self.moves = []
+
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell is not EMPTY:
+                    self.place((i, j), cell)
+        self.moves = []
+        self.turn = game.player(board)
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if self.lines[X]:
+            return X
+        elif self.lines[O]:
+            return O
+        return None
+
+    def window_value(self, w):
+        """
+        Returns the heuristic value of window w for X.
+        """
+        x, o = self.counts[X][w], self.counts[O][w]
+        if x and not o:
+            return self.game.weights[x]
+        elif o and not x:
+            return -self.game.weights[o]
+        return 0
+
+    def place(self, action, mark):
+        """
+        Puts mark on the empty cell action.
+        """
+        i, j = action
+        self.cells[i][j] = mark
+        self.empty -= 1
+        self.hash ^= self.game.zobrist[action, mark]
+        counts = self.counts[mark]
+        for w in self.game.windows_of[action]:
+            self.score -= self.window_value(w)
+            counts[w] += 1
+            if counts[w] == self.game.k:
+                self.lines[mark] += 1
+            self.score += self.window_value(w)
+        self.moves.append(action)
+
+    def make(self, action):
+        """
+        Plays action for the side to move.
+        """
+        self.place(action, self.turn)
+        self.turn = O if self.turn == X else X
+
+    def unmake(self):
+        """
+        Takes back the last move made.
+        """
+        action = self.moves.pop()
+        i, j = action
+        mark = self.cells[i][j]
+        self.cells[i][j] = EMPTY
+        self.empty += 1
+        self.hash ^= self.game.zobrist[action, mark]
+        counts = self.counts[mark]
+        for w in self.game.windows_of[action]:
+            self.score -= self.window_value(w)
+            if counts[w] == self.game.k:
+                self.lines[mark] -= 1
+            counts[w] -= 1
+            self.score += self.window_value(w)
+        self.turn = mark
+
+
+def start_worker(m, n, k, radius):
+    """
+    Sets up the game searched by a worker process.
+    """
+    global worker_game
+    worker_game = Game(m, n, k, radius)
+
+
+def search_move(task):
+    """
+    Searches one (board, action, depth, alpha, beta) root move
+    in a worker process.
+    """
+    return worker_game.search_move(*task)
+
+
+def main():
+    if len(sys.argv) not in (4, 5, 6):
+        sys.exit("Usage: python mnk.py m n k [seconds] [radius]")
+    m, n, k = (int(arg) for arg in sys.argv[1:4])
+    seconds = float(sys.argv[4]) if len(sys.argv) >= 5 else 1.0
+    radius = int(sys.argv[5]) if len(sys.argv) == 6 else None
+
+    # let the computer play itself and show every move
+    game = Game(m, n, k, radius)
+    board = game.initial_state()
+    while not game.terminal(board):
+        start = time.perf_counter()
+        move = game.minimax(board, time_limit=seconds)
+        elapsed = time.perf_counter() - start
+        print(f"{game.player(board)} plays {move} "
+              f"({game.nodes} nodes, {elapsed:.2f} s)")
+        board = game.result(board, move)
+
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    win = game.winner(board)
+    print("Tie." if win is None else f"{win} wins.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,64 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
+import sys
+from array import array
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, mapping cell (i, j)
+# to the cell it moves to
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# Base 3 digit of each cell value in a canonical key
+CELL_CODES = {EMPTY: 0, X: 1, O: 2}
+
+# Base 3 place value of every cell (i, j), in row order, after each symmetry
+SYMMETRY_WEIGHTS = [
+    [3 ** (3 * new_i + new_j) for new_i, new_j in (symmetry(i, j) for i in range(3) for j in range(3))]
+    for symmetry in SYMMETRIES
+]
+
+# Opening book written by book.py, with one uint32 of key * 9 + cell
+# per position, where key is the canonical key of the position and
+# cell is 3 * i + j of the optimal move on the canonical board
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Maps canonical keys to optimal moves, loaded on first use
+book = None
+
+# Every cell (i, j), in the order minimax tries them
+CELLS = [(i, j) for i in range(3) for j in range(3)]
+
+# Every row, column and diagonal, as lists of cells
+LINES = (
+    [[(i, j) for j in range(3)] for i in range(3)]
+    + [[(i, j) for i in range(3)] for j in range(3)]
+    + [[(i, i) for i in range(3)], [(2 - i, i) for i in range(3)]]
+)
+
+# Maps every cell to the indices of the lines through it
+LINES_OF = {cell: [n for n, line in enumerate(LINES) if cell in line] for cell in CELLS}
+
+# Maps board keys to the (value, action) found by minimax for them,
+# shared by every minimax call within and across games
+transpositions = {}
+
+# Counts boards searched and transposition table hits by minimax
+search_stats = {"nodes": 0, "hits": 0}
+
 
 def initial_state():
     """
@@ -60,7 +112,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    result_board = copy.deepcopy(board)
+    result_board = [row[:] for row in board]
     if result_board[action[0]][action[1]] is None:
         result_board[action[0]][action[1]] = player(board)
         return result_board
@@ -119,51 +171,237 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+class GameState():
+    """
+    Board for search that keeps per-line counts of X and O up to date
+    as moves are made and unmade, so that winner and terminal take
+    constant time and no board is copied along the way.
+    """
+
+    def __init__(self, board):
+        self.cells = [row[:] for row in board]
+        self.counts = {X: [0] * len(LINES), O: [0] * len(LINES)}
+
+        # complete lines per player
+        self.lines = {X: 0, O: 0}
+        self.filled = 0
+
+        # base 3 number of the board, with digit 3 * i + j for cell (i, j)
+        self.key = 0
+        self.moves = []
+
+        for i, j in CELLS:
+            if self.cells[i][j] is not EMPTY:
+                self.place((i, j), self.cells[i][j])
+        self.moves = []
+        self.turn = player(board)
+
+    def place(self, action, mark):
+        """
+        Puts mark on the empty cell action.
+        """
+        i, j = action
+        self.cells[i][j] = mark
+        self.filled += 1
+        self.key += CELL_CODES[mark] * 3 ** (3 * i + j)
+        counts = self.counts[mark]
+        for n in LINES_OF[action]:
+            counts[n] += 1
+            if counts[n] == 3:
+                self.lines[mark] += 1
+        self.moves.append(action)
+
+    def make(self, action):
+        """
+        Plays action for the player who has the next turn.
+        """
+        if self.cells[action[0]][action[1]] is not EMPTY:
+            raise Exception("Invalid Move")
+        self.place(action, self.turn)
+        self.turn = O if self.turn == X else X
+
+    def unmake(self):
+        """
+        Takes back the last move made.
+        """
+        i, j = action = self.moves.pop()
+        mark = self.cells[i][j]
+        self.cells[i][j] = EMPTY
+        self.filled -= 1
+        self.key -= CELL_CODES[mark] * 3 ** (3 * i + j)
+        counts = self.counts[mark]
+        for n in LINES_OF[action]:
+            if counts[n] == 3:
+                self.lines[mark] -= 1
+            counts[n] -= 1
+        self.turn = mark
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if self.lines[X]:
+            return X
+        elif self.lines[O]:
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.filled == 9 or self.lines[X] > 0 or self.lines[O] > 0
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if self.lines[X]:
+            return 1
+        elif self.lines[O]:
+            return -1
+        return 0
+
+
+def canonical(board):
+    """
+    Returns (key, symmetry) for the symmetry of the board with the
+    smallest base 3 key, which is the same for every board that is
+    a rotation or reflection of another.
+    """
+    codes = [CELL_CODES[cell] for row in board for cell in row]
+    best = None
+    for s, weights in enumerate(SYMMETRY_WEIGHTS):
+        key = sum(code * weight for code, weight in zip(codes, weights))
+        if best is None or key < best[0]:
+            best = (key, s)
+    return best
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Returns the opening book as a dictionary of canonical keys to
+    moves, or an empty one if it has not been built.
+    """
+    entries = array("I")
+    try:
+        with open(path, "rb") as f:
+            entries.frombytes(f.read())
+    except FileNotFoundError:
+        return {}
+    if sys.byteorder == "big":
+        entries.byteswap()
+    return {entry // 9: (entry % 9 // 3, entry % 3) for entry in entries}
+
+
+def book_move(board):
+    """
+    Returns the opening book move for the board,
+    or None if the board is not in the book.
+    """
+    global book
+    if book is None:
+        book = load_book()
+
+    key, s = canonical(board)
+    if key not in book:
+        return None
+
+    # map the canonical move back onto the board
+    for i in range(3):
+        for j in range(3):
+            if SYMMETRIES[s](i, j) == book[key]:
+                return i, j
+
+
+def minimax(board, memoize=True, use_book=True):
     """
     Returns the optimal action for the current player on the board.
+
+    Positions in the opening book are answered from it unless
+    use_book is False, and positions already solved are looked up
+    in the transposition table unless memoize is False.
     """
-    if player(board) == X:
-        return max_value(board)[1]
-    elif player(board) == O:
-        return min_value(board)[1]
+    if use_book and not terminal(board):
+        move = book_move(board)
+        if move is not None:
+            return move
+
+    table = transpositions if memoize else None
+    state = GameState(board)
+    if state.turn == X:
+        return max_value(state, table)[1]
+    else:
+        return min_value(state, table)[1]
+
 
+def max_value(state, table=None):
+    # check if position was already solved
+    key = state.key
+    if table is not None and key in table:
+        search_stats["hits"] += 1
+        return table[key]
+    search_stats["nodes"] += 1
 
-def max_value(board):
     # check if game ended
-    if terminal(board):
-        return utility(board), None
+    if state.terminal():
+        value = state.utility(), None
 
     else:
         v = -2
         next_move = None
-
-        for action in actions(board):
-            new_v = max(v, min_value(result(board, action))[0])
+        cells = state.cells
+
+        for action in CELLS:
+            if cells[action[0]][action[1]] is not EMPTY:
+                continue
+            state.make(action)
+            new_v = min_value(state, table)[0]
+            state.unmake()
             if new_v > v:
                 v = new_v
                 next_move = action
                 if v == 1:
                     break
 
-        return v, next_move
+        value = v, next_move
+
+    if table is not None:
+        table[key] = value
+    return value
 
 
-def min_value(board):
+def min_value(state, table=None):
+    # check if position was already solved
+    key = state.key
+    if table is not None and key in table:
+        search_stats["hits"] += 1
+        return table[key]
+    search_stats["nodes"] += 1
+
     # check if game ended
-    if terminal(board):
-        return utility(board), None
+    if state.terminal():
+        value = state.utility(), None
 
     else:
         v = 2
         next_move = None
-
-        for action in actions(board):
-            new_v = min(v, max_value(result(board, action))[0])
+        cells = state.cells
+
+        for action in CELLS:
+            if cells[action[0]][action[1]] is not EMPTY:
+                continue
+            state.make(action)
+            new_v = max_value(state, table)[0]
+            state.unmake()
             if new_v < v:
                 v = new_v
                 next_move = action
                 if v == -1:
                     break
 
-        return v, next_move
\ No newline at end of file
+        value = v, next_move
+
+    if table is not None:
+        table[key] = value
+    return value
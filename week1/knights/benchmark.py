@@ -0,0 +1,129 @@
+import random
+import sys
+import time
+
+import puzzle
+from logic import *
+from sat import model_check_sat
+
+
+def statement(rng, people):
+    """
+    Returns a random statement about people, a list of
+    (knight, knave) symbol pairs.
+    """
+    kind = rng.randrange(4)
+    (knight, knave), (other_knight, other_knave) = rng.sample(people, 2)
+    if kind == 0:
+        return knight
+    elif kind == 1:
+        return knave
+    elif kind == 2:
+        return Biconditional(knight, other_knight)
+    return Or(knave, other_knave)
+
+
+def generate(size, rng):
+    """
+    Returns (knowledge, symbols) for a puzzle where each of size
+    people says one random statement about the others.
+    """
+    people = [
+        (Symbol(f"{name} is a Knight"), Symbol(f"{name} is a Knave"))
+        for name in (f"P{i}" for i in range(size))
+    ]
+    knowledge = And()
+    for knight, knave in people:
+        knowledge.add(And(Or(knight, knave), Not(And(knight, knave))))
+        said = statement(rng, people)
+        knowledge.add(Implication(knight, said))
+        knowledge.add(Implication(knave, Not(said)))
+    return knowledge, [symbol for pair in people for symbol in pair]
+
+
+def generate_horn(size, rng):
+    """
+    Returns (knowledge, symbols) for a knowledge base of a few facts
+    and one rule per symbol concluding it from up to two others.
+    """
+    symbols = [Symbol(f"S{i}") for i in range(2 * size)]
+    knowledge = And(*rng.sample(symbols, 2))
+    for symbol in symbols:
+        premises = rng.sample([s for s in symbols if s != symbol], rng.randint(1, 2))
+        knowledge.add(Implication(And(*premises), symbol))
+    return knowledge, symbols
+
+
+def benchmark(puzzles):
+    """
+    Times model_check with and without pruning on every symbol of
+    every (name, knowledge, symbols) puzzle, counting the models visited,
+    model_check_many on all the symbols at once, model_check_sat, and
+    entails with the inference paths it took, exiting if any disagree.
+    """
+    for name, knowledge, symbols in puzzles:
+        results = {}
+        for prune in (False, True):
+            models = 0
+            start = time.perf_counter()
+            answers = []
+            for symbol in symbols:
+                answers.append(model_check(knowledge, symbol, prune=prune))
+                models += check_stats["models"]
+            results[prune] = (answers, models, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        many = model_check_many(knowledge, symbols)
+        batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solved = [model_check_sat(knowledge, symbol) for symbol in symbols]
+        sat = time.perf_counter() - start
+
+        paths = {}
+        inferred = []
+        for symbol in symbols:
+            inferred.append(entails(knowledge, symbol))
+            path = inference_stats["path"]
+            seconds = paths.get(path, (0, 0.0))[1] + inference_stats["seconds"]
+            paths[path] = (paths.get(path, (0, 0.0))[0] + 1, seconds)
+
+        if not results[False][0] == results[True][0] == many == solved == inferred:
+            sys.exit(f"{name}: model checking modes disagree.")
+        full, pruned = results[False], results[True]
+        print(f"{name:>12} {len(symbols):3} symbols "
+              f"full: {full[1]:9} models {full[2]:8.3f} s "
+              f"pruned: {pruned[1]:9} models {pruned[2]:8.3f} s "
+              f"batch: {batch:8.3f} s sat: {sat:8.3f} s")
+        for path, (calls, seconds) in paths.items():
+            print(f"{'':>12} entails: {calls:3} by {path} in {seconds:8.3f} s")
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [people] [count] [seed]")
+    size = int(sys.argv[1]) if len(sys.argv) >= 2 else 6
+    count = int(sys.argv[2]) if len(sys.argv) >= 3 else 3
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [
+        (f"Puzzle {i}", knowledge, symbols)
+        for i, knowledge in enumerate([puzzle.knowledge0, puzzle.knowledge1,
+                                       puzzle.knowledge2, puzzle.knowledge3])
+    ]
+
+    rng = random.Random(seed)
+    for i in range(count):
+        knowledge, people = generate(size, rng)
+        puzzles.append((f"Generated {i}", knowledge, people))
+    for i in range(count):
+        knowledge, horn = generate_horn(size, rng)
+        puzzles.append((f"Horn {i}", knowledge, horn))
+
+    benchmark(puzzles)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,45 @@
 import itertools
+import time
+import weakref
 
 
 class Sentence():
+    __slots__ = ("_frozen", "_hash", "_symbols", "_parents", "__weakref__")
+
+    # Shared Symbol, Not, Implication and Biconditional instances, and
+    # frozen And and Or ones, keyed by their class and the identities
+    # of their parts
+    interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, key):
+        """Returns the live sentence of this class with key, or a new one."""
+        key = (cls, key)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = self.compute_hash()
+            return self._hash
+
+    def __reduce__(self):
+        """Copies and pickles sentences by building them again."""
+        if self._frozen:
+            return rebuild_frozen, (type(self), self.__getnewargs__())
+        return type(self), self.__getnewargs__()
+
+    def freeze(self):
+        """
+        Returns an equal sentence that can never change, shared by
+        every frozen sentence with the same structure.
+        """
+        raise Exception("nothing to freeze")
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,9 +49,75 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def bitset(self, columns, full):
+        """
+        Evaluates the logical sentence in every model at once, where
+        columns maps each symbol to an integer whose bit i is its value
+        in model i, and full has a bit set for every model.
+        """
+        raise Exception("nothing to evaluate")
+
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave some
+        symbols out, returning True, False, or None if still undecided.
+        """
+        raise Exception("nothing to evaluate")
+
+    def occurrences(self, counts):
+        """Adds how many times each symbol occurs in the sentence to counts."""
+        pass
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.cached_symbols())
+
+    def cached_symbols(self):
+        """Returns a frozenset of all symbols, cached until a sentence changes."""
+        try:
+            return self._symbols
+        except AttributeError:
+            self._symbols = self.compute_symbols()
+            return self._symbols
+
+    def compute_symbols(self):
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return frozenset()
+
+    def compute_hash(self):
+        """Returns the structural hash of the logical sentence."""
+        return hash(type(self))
+
+    def attach(self, parent):
+        """
+        Records that parent contains this sentence, so that changes
+        to this one drop the caches of both. Frozen sentences never
+        change, and keep no parents.
+        """
+        if not self._frozen:
+            if not hasattr(self, "_parents"):
+                self._parents = []
+            self._parents.append(weakref.ref(parent))
+
+    def changed(self):
+        """
+        Drops the cached hash and symbols of this sentence and of every
+        sentence containing it. A sentence only caches a value once its
+        parts have, so the walk stops at the first one with nothing cached.
+        """
+        cached = False
+        for name in ("_hash", "_symbols"):
+            if hasattr(self, name):
+                delattr(self, name)
+                cached = True
+        if cached:
+            alive = []
+            for ref in getattr(self, "_parents", ()):
+                parent = ref()
+                if parent is not None:
+                    alive.append(ref)
+                    parent.changed()
+            self._parents = alive
 
     @classmethod
     def validate(cls, sentence):
@@ -43,14 +147,27 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        return cls.intern(name)
 
     def __init__(self, name):
         self.name = name
+        self._frozen = True
+
+    def __getnewargs__(self):
+        return (self.name,)
+
+    def freeze(self):
+        return self
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol) and self.name == other.name)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("symbol", self.name))
 
     def __repr__(self):
@@ -65,19 +182,50 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def partial(self, model):
+        return model.get(self.name)
+
+    def occurrences(self, counts):
+        counts[self.name] = counts.get(self.name, 0) + 1
+
+    def bitset(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def compute_symbols(self):
+        return frozenset([self.name])
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        return cls.intern(id(operand))
+
     def __init__(self, operand):
+
+        # an interned sentence met again is already set up
+        if hasattr(self, "_frozen"):
+            return
         Sentence.validate(operand)
         self.operand = operand
+        self._frozen = operand._frozen
+        operand.attach(self)
+
+    def __getnewargs__(self):
+        return (self.operand,)
+
+    def freeze(self):
+        return self if self._frozen else Not(self.operand.freeze())
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not) and self.operand == other.operand)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -89,20 +237,48 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def bitset(self, columns, full):
+        return full ^ self.operand.bitset(columns, full)
+
+    def partial(self, model):
+        value = self.operand.partial(model)
+        return None if value is None else not value
+
+    def occurrences(self, counts):
+        self.operand.occurrences(counts)
+
+    def compute_symbols(self):
+        return self.operand.cached_symbols()
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self._frozen = False
+        self.conjuncts = conjuncts
+
+    def __setattr__(self, name, value):
+        if name == "conjuncts":
+            value = Sentences.owned_by(self, value)
+        super().__setattr__(name, value)
+        if name == "conjuncts":
+            self.changed()
+
+    def __getnewargs__(self):
+        return tuple(self.conjuncts)
+
+    def freeze(self):
+        return self if self._frozen else Sentences.frozen(And, self.conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And) and self.conjuncts == other.conjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -126,20 +302,60 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def bitset(self, columns, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result &= conjunct.bitset(columns, full)
+        return result
+
+    def partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def occurrences(self, counts):
+        for conjunct in self.conjuncts:
+            conjunct.occurrences(counts)
+
+    def compute_symbols(self):
+        return frozenset().union(
+            *[conjunct.cached_symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self._frozen = False
+        self.disjuncts = disjuncts
+
+    def __setattr__(self, name, value):
+        if name == "disjuncts":
+            value = Sentences.owned_by(self, value)
+        super().__setattr__(name, value)
+        if name == "disjuncts":
+            self.changed()
+
+    def __getnewargs__(self):
+        return tuple(self.disjuncts)
+
+    def freeze(self):
+        return self if self._frozen else Sentences.frozen(Or, self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -157,23 +373,67 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def bitset(self, columns, full):
+        result = 0
+        for disjunct in self.disjuncts:
+            result |= disjunct.bitset(columns, full)
+        return result
+
+    def partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def occurrences(self, counts):
+        for disjunct in self.disjuncts:
+            disjunct.occurrences(counts)
+
+    def compute_symbols(self):
+        return frozenset().union(
+            *[disjunct.cached_symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
+        return cls.intern((id(antecedent), id(consequent)))
+
     def __init__(self, antecedent, consequent):
+
+        # an interned sentence met again is already set up
+        if hasattr(self, "_frozen"):
+            return
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self._frozen = antecedent._frozen and consequent._frozen
+        antecedent.attach(self)
+        consequent.attach(self)
+
+    def __getnewargs__(self):
+        return (self.antecedent, self.consequent)
+
+    def freeze(self):
+        if self._frozen:
+            return self
+        return Implication(self.antecedent.freeze(), self.consequent.freeze())
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
     def __repr__(self):
@@ -188,23 +448,64 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def bitset(self, columns, full):
+        return ((full ^ self.antecedent.bitset(columns, full))
+                | self.consequent.bitset(columns, full))
+
+    def partial(self, model):
+        antecedent = self.antecedent.partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
+    def occurrences(self, counts):
+        self.antecedent.occurrences(counts)
+        self.consequent.occurrences(counts)
+
+    def compute_symbols(self):
+        return self.antecedent.cached_symbols() | self.consequent.cached_symbols()
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
+        return cls.intern((id(left), id(right)))
+
     def __init__(self, left, right):
+
+        # an interned sentence met again is already set up
+        if hasattr(self, "_frozen"):
+            return
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self._frozen = left._frozen and right._frozen
+        left.attach(self)
+        right.attach(self)
+
+    def __getnewargs__(self):
+        return (self.left, self.right)
+
+    def freeze(self):
+        if self._frozen:
+            return self
+        return Biconditional(self.left.freeze(), self.right.freeze())
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
     def __repr__(self):
@@ -221,15 +522,172 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def bitset(self, columns, full):
+        return full ^ (self.left.bitset(columns, full)
+                       ^ self.right.bitset(columns, full))
+
+    def partial(self, model):
+        left = self.left.partial(model)
+        if left is None:
+            return None
+        right = self.right.partial(model)
+        if right is None:
+            return None
+        return left == right
+
+    def occurrences(self, counts):
+        self.left.occurrences(counts)
+        self.right.occurrences(counts)
+
+    def compute_symbols(self):
+        return self.left.cached_symbols() | self.right.cached_symbols()
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+class Sentences(list):
+    """
+    The list of conjuncts of an And or disjuncts of an Or, which drops
+    the cached hash and symbols of its owner whenever it changes, and
+    cannot change once its owner is frozen.
+    """
+    __slots__ = ("owner",)
+
+    @classmethod
+    def owned_by(cls, owner, parts):
+        """Returns a list of parts belonging to owner."""
+        if owner._frozen:
+            raise TypeError("a frozen sentence cannot change")
+        sentences = cls(parts)
+        sentences.owner = weakref.ref(owner)
+        for part in sentences:
+            part.attach(owner)
+        return sentences
+
+    @classmethod
+    def frozen(cls, kind, parts):
+        """Returns the interned frozen And or Or of the frozen parts."""
+        parts = [part.freeze() for part in parts]
+        sentence = kind.intern(tuple(id(part) for part in parts))
+        if not hasattr(sentence, "_frozen"):
+            sentences = cls(parts)
+            sentences.owner = weakref.ref(sentence)
+            object.__setattr__(sentence, "_frozen", True)
+            object.__setattr__(sentence, "conjuncts" if kind is And else "disjuncts", sentences)
+        return sentence
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def changing(self, parts=()):
+        """Checks the owner can change, and attaches it to the new parts."""
+        owner = self.owner()
+        if owner is None:
+            return
+        if owner._frozen:
+            raise TypeError("a frozen sentence cannot change")
+        for part in parts:
+            part.attach(owner)
+
+    def changed(self):
+        """Drops the caches of the owner."""
+        owner = self.owner()
+        if owner is not None:
+            owner.changed()
+
+    def append(self, part):
+        self.changing([part])
+        super().append(part)
+        self.changed()
+
+    def extend(self, parts):
+        parts = list(parts)
+        self.changing(parts)
+        super().extend(parts)
+        self.changed()
+
+    def insert(self, index, part):
+        self.changing([part])
+        super().insert(index, part)
+        self.changed()
+
+    def __setitem__(self, index, value):
+        value = list(value) if isinstance(index, slice) else value
+        self.changing(value if isinstance(index, slice) else [value])
+        super().__setitem__(index, value)
+        self.changed()
+
+    def __iadd__(self, parts):
+        self.extend(parts)
+        return self
+
+    def __imul__(self, count):
+        self.changing()
+        super().__imul__(count)
+        self.changed()
+        return self
+
+    def __delitem__(self, index):
+        self.changing()
+        super().__delitem__(index)
+        self.changed()
+
+    def pop(self, index=-1):
+        self.changing()
+        part = super().pop(index)
+        self.changed()
+        return part
+
+    def remove(self, part):
+        self.changing()
+        super().remove(part)
+        self.changed()
+
+    def clear(self):
+        self.changing()
+        super().clear()
+        self.changed()
+
+    def sort(self, *args, **kwargs):
+        self.changing()
+        super().sort(*args, **kwargs)
+        self.changed()
+
+    def reverse(self):
+        self.changing()
+        super().reverse()
+        self.changed()
+
+
+def rebuild_frozen(kind, parts):
+    """Returns the frozen sentence of a kind built from parts, for __reduce__."""
+    return kind(*parts).freeze()
+
+
+# Counts the models, partial or complete, visited by the most recent model_check
+check_stats = {"models": 0}
+
+
+def model_check(knowledge, query, prune=True):
+    """
+    Checks if knowledge base entails query.
+
+    With prune, a partial model that already decides the knowledge base
+    false, or decides both it and the query, is not extended further,
+    and symbols are assigned most frequent in the knowledge base first.
+    """
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
+        check_stats["models"] += 1
+
+        # If the partial model already decides the outcome
+        if prune:
+            known = knowledge.partial(model)
+            if known is False:
+                return True
+            if known is True:
+                answer = query.partial(model)
+                if answer is not None:
+                    return answer
 
         # If model has an assignment for each symbol
         if not symbols:
@@ -240,9 +698,9 @@ def model_check(knowledge, query):
             return True
         else:
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+            # Choose the next unused symbol
+            p = symbols[0]
+            remaining = symbols[1:]
 
             # Create a model where the symbol is true
             model_true = model.copy()
@@ -256,8 +714,189 @@ def model_check(knowledge, query):
             return (check_all(knowledge, query, remaining, model_true) and
                     check_all(knowledge, query, remaining, model_false))
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    # Get all symbols in both knowledge and query, most frequent first
+    counts = {}
+    knowledge.occurrences(counts)
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()),
+                     key=lambda symbol: (-counts.get(symbol, 0), symbol))
 
     # Check that knowledge entails query
+    check_stats["models"] = 0
     return check_all(knowledge, query, symbols, dict())
+
+
+def truth_table(symbols):
+    """
+    Returns (columns, full) for bitset evaluation over every model of
+    the symbols: bit i of each column is the symbol's value in model i.
+    """
+    symbols = sorted(symbols)
+    size = 2 ** len(symbols)
+    full = (1 << size) - 1
+    columns = {}
+    for bit, symbol in enumerate(symbols):
+
+        # a block of 2^bit false models then 2^bit true ones,
+        # doubled until it covers every model
+        width = 2 ** bit
+        column = ((1 << width) - 1) << width
+        length = 2 * width
+        while length < size:
+            column |= column << length
+            length *= 2
+        columns[symbol] = column
+    return columns, full
+
+
+def model_check_bitset(knowledge, query):
+    """Checks if knowledge base entails query, over all models at once."""
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    columns, full = truth_table(symbols)
+
+    # Every model of the knowledge base must be a model of the query
+    knowledge_models = knowledge.bitset(columns, full)
+    query_models = query.bitset(columns, full)
+    return knowledge_models & ~query_models == 0
+
+
+def model_check_many(knowledge, queries):
+    """
+    Checks which of the queries knowledge base entails, returning a list
+    of booleans. The models of the knowledge base are found once, as a
+    bitset over the symbols of every query, and shared by all of them.
+    """
+    queries = list(queries)
+    symbols = knowledge.symbols().union(*[query.symbols() for query in queries])
+    columns, full = truth_table(symbols)
+
+    knowledge_models = knowledge.bitset(columns, full)
+    return [knowledge_models & ~query.bitset(columns, full) == 0 for query in queries]
+
+
+# Path taken and time spent by the most recent call to entails
+inference_stats = {"path": None, "seconds": 0.0}
+
+
+def horn_atoms(sentence):
+    """
+    Returns the symbol names of a symbol or a conjunction of symbols,
+    or None if the sentence is anything else.
+    """
+    if isinstance(sentence, Symbol):
+        return [sentence.name]
+    if isinstance(sentence, And):
+        atoms = []
+        for conjunct in sentence.conjuncts:
+            conjunct_atoms = horn_atoms(conjunct)
+            if conjunct_atoms is None:
+                return None
+            atoms += conjunct_atoms
+        return atoms
+    return None
+
+
+def horn_clauses(sentence):
+    """
+    Returns the definite clauses of a sentence as a list of
+    (premises, conclusion) pairs of symbol names, or None if the
+    sentence is not in Horn form.
+    """
+    if isinstance(sentence, Symbol):
+        return [((), sentence.name)]
+    if isinstance(sentence, And):
+        clauses = []
+        for conjunct in sentence.conjuncts:
+            conjunct_clauses = horn_clauses(conjunct)
+            if conjunct_clauses is None:
+                return None
+            clauses += conjunct_clauses
+        return clauses
+    if isinstance(sentence, Implication):
+        premises = horn_atoms(sentence.antecedent)
+        conclusions = horn_atoms(sentence.consequent)
+        if premises is None or conclusions is None:
+            return None
+        return [(tuple(premises), conclusion) for conclusion in conclusions]
+    if isinstance(sentence, Or):
+
+        # a disjunction of one symbol and any number of negated symbols
+        positive = [d.name for d in sentence.disjuncts if isinstance(d, Symbol)]
+        negative = [d.operand for d in sentence.disjuncts if isinstance(d, Not)]
+        if (len(positive) != 1
+                or len(positive) + len(negative) != len(sentence.disjuncts)
+                or not all(isinstance(operand, Symbol) for operand in negative)):
+            return None
+        return [(tuple(operand.name for operand in negative), positive[0])]
+    return None
+
+
+def forward_chain(clauses, goals):
+    """
+    Returns True if every goal symbol follows from the definite clauses,
+    firing each clause once when its count of unproven premises reaches 0.
+    """
+    goals = set(goals)
+    count = []
+    watching = {}
+    agenda = []
+    for i, (premises, conclusion) in enumerate(clauses):
+        premises = set(premises)
+        count.append(len(premises))
+        for premise in premises:
+            watching.setdefault(premise, []).append(i)
+        if not premises:
+            agenda.append(conclusion)
+
+    inferred = set()
+    while agenda:
+        p = agenda.pop()
+        if p in inferred:
+            continue
+        inferred.add(p)
+        goals.discard(p)
+        if not goals:
+            return True
+        for i in watching.get(p, ()):
+            count[i] -= 1
+            if count[i] == 0:
+                agenda.append(clauses[i][1])
+    return not goals
+
+
+def entails(knowledge, query, fallback=model_check):
+    """
+    Checks if knowledge base entails query, by forward chaining over
+    its Horn clauses when the query is a symbol or a conjunction of
+    symbols, and with the fallback checker otherwise.
+
+    Records the path taken and its time in inference_stats.
+    """
+    start = time.perf_counter()
+    goals = horn_atoms(query)
+    if goals is not None:
+        conjuncts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+        clauses = []
+        rest = []
+        for conjunct in conjuncts:
+            conjunct_clauses = horn_clauses(conjunct)
+            if conjunct_clauses is None:
+                rest.append(conjunct)
+            else:
+                clauses += conjunct_clauses
+
+        # Definite clauses always have a model, so forward chaining is
+        # complete for them, and what they entail the whole base entails
+        if forward_chain(clauses, goals):
+            path = "forward chaining" if not rest else "forward chaining (Horn part)"
+            return record(True, path, start)
+        if not rest:
+            return record(False, "forward chaining", start)
+
+    return record(fallback(knowledge, query), "fallback", start)
+
+
+def record(result, path, start):
+    """Records the path taken by entails, returning its result."""
+    inference_stats["path"] = path
+    inference_stats["seconds"] = time.perf_counter() - start
+    return result
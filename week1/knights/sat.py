@@ -0,0 +1,222 @@
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from logical sentences
+    with the Tseitin encoding: every connective gets a new variable
+    equivalent to it, so the clauses grow linearly with the sentence.
+
+    Variables are positive integers and literals are signed integers.
+    """
+
+    def __init__(self):
+        # maps symbol names to their variables
+        self.variables = {}
+        self.clauses = []
+
+        # maps sentences already encoded to their literal
+        self.literals = {}
+        self.count = 0
+
+    def variable(self):
+        """Returns a new variable."""
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to the sentence, adding clauses as needed."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            literal = self.conjunction([self.literal(c) for c in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            literal = -self.conjunction([-self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            literal = -self.conjunction([self.literal(sentence.antecedent),
+                                         -self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.variable()
+            self.clauses += [
+                [-literal, -left, right], [-literal, left, -right],
+                [literal, left, right], [literal, -left, -right],
+            ]
+        else:
+            raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def conjunction(self, literals):
+        """Returns a new variable equivalent to the conjunction of literals."""
+        variable = self.variable()
+        for literal in literals:
+            self.clauses.append([-variable, literal])
+        self.clauses.append([variable] + [-literal for literal in literals])
+        return variable
+
+    def add(self, sentence):
+        """Adds clauses requiring the sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """
+    DPLL satisfiability solver with two watched literals per clause
+    for unit propagation and chronological backtracking.
+    """
+
+    def __init__(self, clauses, count):
+        self.count = count
+        self.clauses = []
+        self.units = []
+        self.empty = False
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+
+            # clauses with both a literal and its negation are always true
+            if any(-literal in clause for literal in clause):
+                continue
+            if len(clause) == 0:
+                self.empty = True
+            elif len(clause) == 1:
+                self.units.append(clause[0])
+            else:
+                self.clauses.append(clause)
+
+        # maps literals to the clauses watching them, the first
+        # two literals of every clause being the watched ones
+        self.watches = {}
+        for i, clause in enumerate(self.clauses):
+            self.watches.setdefault(clause[0], []).append(i)
+            self.watches.setdefault(clause[1], []).append(i)
+
+        # 1 for true, -1 for false, 0 for unassigned, by variable
+        self.values = [0] * (count + 1)
+        self.trail = []
+        self.head = 0
+
+        # branch on the variables in the most clauses first
+        occurrences = [0] * (count + 1)
+        for clause in clauses:
+            for literal in clause:
+                occurrences[abs(literal)] += 1
+        self.order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+
+        self.decisions = 0
+        self.propagations = 0
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal):
+        """Makes literal true."""
+        self.values[abs(literal)] = 1 if literal > 0 else -1
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Assigns every unit literal, returning False on a conflict."""
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            keep = []
+
+            for n, i in enumerate(watching):
+                clause = self.clauses[i]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                # the clause is already satisfied by its other watch
+                if self.value(clause[0]) == 1:
+                    keep.append(i)
+                    continue
+
+                # watch another literal that is not false
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(i)
+                        break
+                else:
+                    keep.append(i)
+                    if self.value(clause[0]) == -1:
+                        self.watches[false] = keep + watching[n + 1:]
+                        return False
+                    self.assign(clause[0])
+                    self.propagations += 1
+
+            self.watches[false] = keep
+        return True
+
+    def solve(self):
+        """Returns a satisfying assignment by variable, or None if there is none."""
+        if self.empty:
+            return None
+        for literal in self.units:
+            if self.value(literal) == -1:
+                return None
+            if self.value(literal) == 0:
+                self.assign(literal)
+
+        # (trail length before the decision, decided literal, already flipped)
+        decisions = []
+        while True:
+            if not self.propagate():
+
+                # undo up to the latest decision not yet flipped
+                while decisions and decisions[-1][2]:
+                    decisions.pop()
+                if not decisions:
+                    return None
+                start, literal, _ = decisions.pop()
+                self.undo(start)
+                decisions.append((start, -literal, True))
+                self.assign(-literal)
+                continue
+
+            variable = next((v for v in self.order if self.values[v] == 0), None)
+            if variable is None:
+                return {v: self.values[v] == 1 for v in range(1, self.count + 1)}
+            self.decisions += 1
+            decisions.append((len(self.trail), variable, False))
+            self.assign(variable)
+
+    def undo(self, start):
+        """Unassigns every literal on the trail from start on."""
+        for literal in self.trail[start:]:
+            self.values[abs(literal)] = 0
+        del self.trail[start:]
+        self.head = start
+
+
+def satisfiable(*sentences):
+    """Returns a model of the sentences as a dictionary of symbols, or None."""
+    cnf = CNF()
+    for sentence in sentences:
+        cnf.add(sentence)
+    assignment = Solver(cnf.clauses, cnf.count).solve()
+    if assignment is None:
+        return None
+    return {name: assignment[variable] for name, variable in cnf.variables.items()}
+
+
+def model_check_sat(knowledge, query):
+    """Checks if knowledge base entails query, by proving knowledge ∧ ¬query unsatisfiable."""
+    return satisfiable(knowledge, Not(query)) is None
@@ -0,0 +1,89 @@
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+# Maps strategies for when no safe move is known to the AI method making the move
+STRATEGIES = {
+    "random": MinesweeperAI.make_random_move,
+    "probable": MinesweeperAI.make_probable_move,
+}
+
+
+def play(height, width, mines, latencies, strategy="random"):
+    """
+    Plays one game with the AI until it wins or reveals a mine, adding
+    the time of every add_knowledge call to latencies. Returns whether
+    the game was won and the largest knowledge base seen.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    largest = 0
+
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = STRATEGIES[strategy](ai)
+            if move is None:
+                return ai.mines == game.mines, largest
+        if game.is_mine(move):
+            return False, largest
+
+        nearby = game.nearby_mines(move)
+        start = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        latencies.append(time.perf_counter() - start)
+        largest = max(largest, len(ai.knowledge))
+
+        # the AI must never be wrong about a cell it claims to know
+        if not ai.mines <= game.mines or ai.safes & game.mines:
+            sys.exit("The AI inferred a wrong cell.")
+
+
+def main():
+    if len(sys.argv) > 6:
+        sys.exit("Usage: python benchmark.py [height] [width] [mines] [games] [seed]")
+    height = int(sys.argv[1]) if len(sys.argv) >= 2 else 16
+    width = int(sys.argv[2]) if len(sys.argv) >= 3 else 30
+    mines = int(sys.argv[3]) if len(sys.argv) >= 4 else 99
+    games = int(sys.argv[4]) if len(sys.argv) >= 5 else 20
+    seed = int(sys.argv[5]) if len(sys.argv) == 6 else 0
+
+    for strategy in STRATEGIES:
+        latencies = []
+        wins = 0
+        largest = 0
+        start = time.perf_counter()
+        for game in range(games):
+
+            # both strategies play the same boards
+            random.seed(f"{seed}-{game}")
+            won, size = play(height, width, mines, latencies, strategy)
+            wins += won
+            largest = max(largest, size)
+        total = time.perf_counter() - start
+
+        latencies.sort()
+        print(f"{strategy}: {games} games on {height}x{width} with {mines} mines "
+              f"in {total:.2f} s, {wins} won ({wins / games:.1%})")
+        print(f"  add_knowledge: {len(latencies)} calls "
+              f"mean {sum(latencies) / len(latencies) * 1000:.3f} ms "
+              f"p50 {percentile(latencies, 0.50) * 1000:.3f} ms "
+              f"p99 {percentile(latencies, 0.99) * 1000:.3f} ms "
+              f"max {latencies[-1] * 1000:.3f} ms")
+        print(f"  largest knowledge base: {largest} sentences")
+
+
+if __name__ == "__main__":
+    main()
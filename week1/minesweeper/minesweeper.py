@@ -1,6 +1,9 @@
+import collections
 import itertools
 import random
 
+from probability import mine_probabilities
+
 
 class Minesweeper():
     """
@@ -89,24 +92,31 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cells are a frozenset, so that sentences can be hashed and
+    deduplicated; marking a cell returns a new sentence instead of
+    changing this one.
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = frozenset(cells)
         self.count = count
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
 
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
         if self.count > 0 and self.count == len(self.cells):
-            return self.cells
+            return set(self.cells)
         else:
             return set()
 
@@ -115,27 +125,27 @@ class Sentence():
         Returns the set of all cells in self.cells known to be safe.
         """
         if self.count == 0:
-            return self.cells
+            return set(self.cells)
         else:
             return set()
 
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
+        Returns the sentence that follows given the fact that
         a cell is known to be a mine.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
-
+            return Sentence(self.cells - {cell}, self.count - 1)
+        return self
 
     def mark_safe(self, cell):
         """
-        Updates internal knowledge representation given the fact that
+        Returns the sentence that follows given the fact that
         a cell is known to be safe.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            return Sentence(self.cells - {cell}, self.count)
+        return self
 
 
 class MinesweeperAI():
@@ -143,11 +153,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height, width and number of mines
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -156,26 +167,35 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # Maps each cell to the sentences in knowledge that mention it
+        self.sentences_of = {}
+
+        # Cells waiting to be marked, as (cell, is mine) pairs, and
+        # sentences waiting to be compared with those they overlap
+        self.marks = collections.deque()
+        self.worklist = collections.deque()
+
+        # Mine counts of frontier components, by their sentences
+        self.component_counts = {}
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.marks.append((cell, True))
+        self.propagate()
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.marks.append((cell, False))
+        self.propagate()
 
     def add_knowledge(self, cell, count):
         """
@@ -197,7 +217,7 @@ class MinesweeperAI():
         self.moves_made.add(cell)
 
         # 2) mark safe
-        self.mark_safe(cell)
+        self.marks.append((cell, False))
 
         # 3) add new sentence
         i = cell[0]
@@ -208,49 +228,94 @@ class MinesweeperAI():
             for m in range(-1, 2):
                 if self.height > i + n >= 0 and self.width > j + m >= 0:
                     neighbor_cell = (i + n, j + m)
-                    if neighbor_cell in self.mines:
-                        count -= 1
-                    elif neighbor_cell != cell and neighbor_cell not in self.moves_made.union(self.safes):
+                    if neighbor_cell != cell:
                         neighbor_cells.add(neighbor_cell)
 
-        new_sentence = Sentence(neighbor_cells, count)
-        self.knowledge.append(new_sentence)
-
-        # 4) mark additional safe cells and mine cells
-        safe_cells = set()
-        mine_cells = set()
-
-        for sentence in self.knowledge:
-            for cell in sentence.known_safes():
-                safe_cells.add(cell)
-            for cell in sentence.known_mines():
-                mine_cells.add(cell)
-
-        for cell in safe_cells:
-            self.mark_safe(cell)
-
-        for cell in mine_cells:
-            self.mark_mine(cell)
-
-        # clear out empty sentences
-        for sentence in self.knowledge:
-            if sentence.cells == set():
-                self.knowledge.remove(sentence)
-
-        # 5) add new sentences from inferencing
-        for sentence1 in self.knowledge:
-            for sentence2 in self.knowledge:
-                if len(sentence1.cells) > len(sentence2.cells) and sentence2.cells in sentence1.cells:
-                    new_cells = sentence1.cells - sentence2.cells
-                    new_count = sentence1.count - sentence2.count
-                    new_sentence = Sentence(new_cells, new_count)
-                    self.knowledge.append(new_sentence)
-                elif len(sentence2.cells) > len(sentence1.cells) and sentence1.cells in sentence2.cells:
-                    new_cells = sentence2.cells - sentence1.cells
-                    new_count = sentence2.count - sentence1.count
-                    new_sentence = Sentence(new_cells, new_count)
-                    self.knowledge.append(new_sentence)
+        self.add_sentence(neighbor_cells, count)
 
+        # 4) and 5) mark cells and infer sentences until nothing changes
+        self.propagate()
+
+    def add_sentence(self, cells, count):
+        """
+        Adds the sentence that count of cells are mines, leaving out
+        cells already known, unless it is already in the knowledge base.
+        Sentences with only safes or only mines mark their cells instead.
+        """
+        cells = set(cells) - self.safes
+        mines = cells & self.mines
+        cells -= mines
+        count -= len(mines)
+        if not cells:
+            return
+
+        if count == 0:
+            self.marks.extend((cell, False) for cell in cells)
+            return
+        if count == len(cells):
+            self.marks.extend((cell, True) for cell in cells)
+            return
+
+        sentence = Sentence(cells, count)
+        if sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.sentences_of.setdefault(cell, set()).add(sentence)
+        self.worklist.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base and the cell index.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.sentences_of.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.sentences_of[cell]
+
+    def propagate(self):
+        """
+        Marks cells and compares sentences with the ones they overlap,
+        until there is nothing left to mark and no new sentence.
+        """
+        while self.marks or self.worklist:
+
+            # Known cells are taken out of every sentence mentioning them
+            while self.marks:
+                cell, mine = self.marks.popleft()
+                known = self.mines if mine else self.safes
+                if cell in known:
+                    continue
+                known.add(cell)
+                for sentence in list(self.sentences_of.get(cell, ())):
+                    self.remove_sentence(sentence)
+                    marked = sentence.mark_mine(cell) if mine else sentence.mark_safe(cell)
+                    self.add_sentence(marked.cells, marked.count)
+
+            if not self.worklist:
+                break
+
+            # A sentence whose cells include another's splits into that
+            # one and the difference, which together say the same thing
+            sentence = self.worklist.popleft()
+            if sentence not in self.knowledge:
+                continue
+            overlapping = set()
+            for cell in sentence.cells:
+                overlapping |= self.sentences_of[cell]
+            for other in overlapping:
+                if other == sentence or other not in self.knowledge:
+                    continue
+                if other.cells < sentence.cells:
+                    self.remove_sentence(sentence)
+                    self.add_sentence(sentence.cells - other.cells, sentence.count - other.count)
+                    break
+                if sentence.cells < other.cells:
+                    self.remove_sentence(other)
+                    self.add_sentence(other.cells - sentence.cells, other.count - sentence.count)
 
     def make_safe_move(self):
         """
@@ -276,11 +341,39 @@ class MinesweeperAI():
             2) are not known to be mines
         """
         board = set()
-        for i in range(8):
-            for j in range(8):
+        for i in range(self.height):
+            for j in range(self.width):
                 board.add((i, j))
         choices = board - self.mines - self.moves_made
         if choices != set():
             return random.choice(list(choices))
         else:
             return None
+
+    def make_probable_move(self):
+        """
+        Returns the move on the Minesweeper board least likely to be
+        a mine, among cells that have not already been chosen and are
+        not known to be mines, with ties broken randomly.
+        """
+        unknown = set()
+        for i in range(self.height):
+            for j in range(self.width):
+                unknown.add((i, j))
+        unknown -= self.mines | self.moves_made
+        if not unknown:
+            return None
+
+        probabilities = mine_probabilities(
+            self.knowledge, self.sentences_of, unknown - self.safes,
+            self.total_mines - len(self.mines), self.component_counts
+        )
+        if probabilities is None:
+            return self.make_random_move()
+        for cell in unknown & self.safes:
+            probabilities[cell] = 0
+        lowest = min(probabilities.values())
+        return random.choice(sorted(
+            cell for cell, probability in probabilities.items()
+            if probability <= lowest + 1e-9
+        ))
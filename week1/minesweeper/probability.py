@@ -0,0 +1,210 @@
+"""
+Exact mine probabilities for the unknown cells of a Minesweeper board.
+
+The frontier, the unknown cells some sentence mentions, splits into
+components that share no sentence, and each component's consistent mine
+configurations are counted by the number of mines they use. Combining
+the components, weighted by the ways to place the remaining mines among
+the cells no sentence mentions, gives every cell's chance of a mine.
+"""
+
+import bisect
+import math
+
+
+def convolve(a, b, shift=0):
+    """
+    Returns the distribution of the sum of mine counts from two
+    dictionaries mapping mine counts to numbers of ways, plus shift.
+    """
+    result = {}
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j + shift] = result.get(i + j + shift, 0) + x * y
+    return result
+
+
+def components(knowledge, sentences_of):
+    """
+    Returns the sentences of knowledge grouped into components,
+    two sentences being in the same component if they share a cell.
+    """
+    seen = set()
+    groups = []
+    for sentence in knowledge:
+        if sentence in seen:
+            continue
+        seen.add(sentence)
+        group = [sentence]
+        for member in group:
+            for cell in member.cells:
+                for other in sentences_of[cell]:
+                    if other not in seen:
+                        seen.add(other)
+                        group.append(other)
+        groups.append(group)
+    return groups
+
+
+def count_component(sentences):
+    """
+    Counts the mine configurations of a component's cells that satisfy
+    all of its sentences, returning (cells, totals, mines) where totals
+    maps mine counts to numbers of configurations, and mines[i] maps
+    mine counts to the configurations among those with cells[i] a mine.
+
+    Cells are decided one at a time in breadth-first order, so few
+    sentences are ever partly decided, and a configuration prefix is
+    only remembered as the mines each partly decided sentence still
+    needs: the number of prefixes reaching that state are counted
+    forwards, the number of ways to finish it backwards.
+    """
+
+    # Order cells breadth-first through the sentences they share
+    cells = []
+    position = {}
+    for sentence in sentences:
+        for cell in sorted(sentence.cells):
+            if cell not in position:
+                position[cell] = len(cells)
+                cells.append(cell)
+    n = len(cells)
+
+    positions = [sorted(position[cell] for cell in sentence.cells) for sentence in sentences]
+    touching = [[] for _ in range(n)]
+    for j, cell_positions in enumerate(positions):
+        for i in cell_positions:
+            touching[i].append(j)
+
+    # Sentences partly decided before each cell
+    active = [[] for _ in range(n + 1)]
+    for j, cell_positions in enumerate(positions):
+        for i in range(cell_positions[0] + 1, cell_positions[-1] + 1):
+            active[i].append(j)
+
+    steps = {}
+
+    def step(i, state):
+        """Returns the (mine, next state) choices for cell i from state."""
+        key = (i, state)
+        if key in steps:
+            return steps[key]
+        needed = dict(zip(active[i], state))
+        for j in touching[i]:
+            if positions[j][0] == i:
+                needed[j] = sentences[j].count
+
+        choices = []
+        for mine in (0, 1):
+            after = {}
+            for j, count in needed.items():
+                if j in touching[i]:
+                    count -= mine
+
+                    # the sentence needs more mines than it has cells left
+                    left = len(positions[j]) - bisect.bisect_right(positions[j], i)
+                    if count < 0 or count > left:
+                        break
+                after[j] = count
+            else:
+                choices.append((mine, tuple(after[j] for j in active[i + 1])))
+        steps[key] = choices
+        return choices
+
+    forward = [{} for _ in range(n + 1)]
+    forward[0][()] = {0: 1}
+    for i in range(n):
+        for state, ways in forward[i].items():
+            for mine, after in step(i, state):
+                reached = forward[i + 1].setdefault(after, {})
+                for k, count in ways.items():
+                    reached[k + mine] = reached.get(k + mine, 0) + count
+
+    backward = [{} for _ in range(n + 1)]
+    backward[n][()] = {0: 1}
+    for i in range(n - 1, -1, -1):
+        for state in forward[i]:
+            finishes = {}
+            for mine, after in step(i, state):
+                if after in backward[i + 1]:
+                    for k, count in backward[i + 1][after].items():
+                        finishes[k + mine] = finishes.get(k + mine, 0) + count
+            if finishes:
+                backward[i][state] = finishes
+
+    totals = backward[0].get((), {})
+    mines = []
+    for i in range(n):
+        cell_mines = {}
+        for state, ways in forward[i].items():
+            for mine, after in step(i, state):
+                if mine and after in backward[i + 1]:
+                    for k, count in convolve(ways, backward[i + 1][after], 1).items():
+                        cell_mines[k] = cell_mines.get(k, 0) + count
+        mines.append(cell_mines)
+    return cells, totals, mines
+
+
+def mine_probabilities(knowledge, sentences_of, unknown, remaining, cache=None):
+    """
+    Returns a dictionary mapping each unknown cell to its probability of
+    being a mine, given the sentences of knowledge about the unknown
+    cells and the number of mines remaining among them, or None if the
+    knowledge is inconsistent with that number.
+
+    Components counted before are looked up in cache, a dictionary
+    keyed by their frozenset of sentences, which is updated in place.
+    """
+    counted = []
+    used = {}
+    for group in components(knowledge, sentences_of):
+        key = frozenset(group)
+        if cache is not None and key in cache:
+            used[key] = cache[key]
+        else:
+            used[key] = count_component(group)
+        counted.append(used[key])
+    if cache is not None:
+        cache.clear()
+        cache.update(used)
+
+    frontier = {cell for cells, _, _ in counted for cell in cells}
+    others = len(unknown - frontier)
+
+    def placements(mines):
+        """Returns the ways to put the mines left among the other cells."""
+        left = remaining - mines
+        return math.comb(others, left) if 0 <= left <= others else 0
+
+    # Distributions of frontier mines without each component, and in total
+    prefix = [{0: 1}]
+    for _, totals, _ in counted:
+        prefix.append(convolve(prefix[-1], totals))
+    suffix = [{0: 1}]
+    for _, totals, _ in reversed(counted):
+        suffix.append(convolve(suffix[-1], totals))
+    suffix.reverse()
+
+    weight = sum(count * placements(k) for k, count in prefix[-1].items())
+    if weight == 0:
+        return None
+
+    probabilities = {}
+    for c, (cells, totals, mines) in enumerate(counted):
+        rest = convolve(prefix[c], suffix[c + 1])
+        completions = {
+            k: sum(count * placements(k + m) for m, count in rest.items())
+            for k in totals
+        }
+        for cell, cell_mines in zip(cells, mines):
+            probabilities[cell] = sum(
+                count * completions[k] for k, count in cell_mines.items()
+            ) / weight
+
+    if others:
+        other_mines = sum(
+            count * placements(k) * (remaining - k) for k, count in prefix[-1].items()
+        )
+        for cell in unknown - frontier:
+            probabilities[cell] = other_mines / (others * weight)
+    return probabilities